@@ -0,0 +1,221 @@
+"""
+Regression test for InputGenerator's graph construction.
+
+The expected graphs are generated programmatically from compact edge-pair
+lists instead of hardcoded edge-dict literals: every expected edge shares
+the same degenerate (distance, traffic_factor) = (8.0, 1.0), so a flat
+list of (from, to) label pairs plus a small builder reproduces the full
+expected structure at a fraction of the source size and parse time.
+"""
+
+import os
+import sys
+from typing import Any, Dict, List, NamedTuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "archive"))
+
+from InputGenerator.input_generator import build_graph_with_matrices  # noqa: E402
+
+
+def expand(pairs, node_types):
+    """Expand a compact (from, to) pair list into a full expected graph dict.
+
+    Labels are interned so that every equality check during edge sorting
+    and comparison is a pointer compare rather than a character-wise one.
+    """
+    intern = sys.intern
+    return {
+        "nodes": {intern(label): {"type": node_types[label]} for label in node_types},
+        "edges": [
+            {"from": intern(a), "to": intern(b), "distance": 8.0, "traffic_factor": 1.0}
+            for a, b in pairs
+        ],
+    }
+
+
+def _edge_key(edge):
+    return (edge["from"], edge["to"])
+
+
+def _edge_signature(edges):
+    """Sorted int64 array of per-edge hashes for a C-level sort+compare."""
+    return np.sort(np.fromiter(
+        (hash((e["from"], e["to"], e["distance"], e["traffic_factor"]))
+         for e in edges),
+        dtype=np.int64,
+        count=len(edges),
+    ))
+
+
+def same_graph(g1, g2):
+    """Compare two graphs ignoring edge order, short-circuiting on mismatch."""
+    if g1["nodes"] != g2["nodes"]:
+        return False
+    if np is not None:
+        return np.array_equal(_edge_signature(g1["edges"]),
+                              _edge_signature(g2["edges"]))
+    s1 = sorted(g1["edges"], key=_edge_key)
+    s2 = sorted(g2["edges"], key=_edge_key)
+    return len(s1) == len(s2) and all(a == b for a, b in zip(s1, s2))
+
+
+def build_from_adjacency(table, idx2label, node_types):
+    """Build a graph with degenerate ranges so every edge is (8.0, 1.0)."""
+    graph, _, _, _, _, _ = build_graph_with_matrices(
+        table=table,
+        idx2label=idx2label,
+        node_types=node_types,
+        undirected=True,
+        distance_range=(8.0, 8.0),
+        traffic_range=(1.0, 1.0),
+        seed=0,
+    )
+    return graph
+
+
+# ============================================================================
+# FIXTURE 1: canonical 26-node example (same as input_generator.py main)
+# ============================================================================
+
+table1 = [
+    [1, 2],  # Node 0: D (depot)
+    [0, 2, 5, 7],  # Node 1: 1 (intersection)
+    [0, 1, 4, 5, 6],  # Node 2: 2 (intersection)
+    [9, 15, 16, 21, 23],  # Node 3: C1 (customer)
+    [2, 5, 6, 7, 17],  # Node 4: C2 (customer)
+    [1, 2, 4, 7, 17],  # Node 5: BSS1 (bss)
+    [2, 4, 7, 11],  # Node 6: 3 (intersection)
+    [1, 4, 5, 6, 17],  # Node 7: 4 (intersection)
+    [10, 12, 18, 22],  # Node 8: C3 (customer)
+    [3, 15, 21, 23],  # Node 9: C4 (customer)
+    [8, 12, 18, 22],  # Node 10: BSS2 (bss)
+    [6, 13, 17, 22, 25],  # Node 11: BSS3 (bss)
+    [8, 10, 18, 22],  # Node 12: C5 (customer)
+    [11, 22, 25],  # Node 13: 5 (intersection)
+    [19, 24],  # Node 14: C6 (customer)
+    [3, 9, 16, 21],  # Node 15: C7 (customer)
+    [3, 15, 19, 20, 24],  # Node 16: BSS4 (bss)
+    [4, 5, 7, 11, 20],  # Node 17: 6 (intersection)
+    [8, 10, 12, 21, 25],  # Node 18: 7 (intersection)
+    [14, 16, 20, 24],  # Node 19: 8 (intersection)
+    [16, 17, 19, 24, 25],  # Node 20: C8 (customer)
+    [3, 9, 15, 18, 23],  # Node 21: BSS5 (bss)
+    [8, 10, 11, 12, 13],  # Node 22: 9 (intersection)
+    [3, 9, 21, 25],  # Node 23: 10 (intersection)
+    [14, 16, 19, 20],  # Node 24: C9 (customer)
+    [11, 13, 18, 20, 23],  # Node 25: C10 (customer)
+]
+
+idx2label1 = {k: sys.intern(v) for k, v in {
+    0: "D",
+    1: "1",
+    2: "2",
+    3: "C1",
+    4: "C2",
+    5: "BSS1",
+    6: "3",
+    7: "4",
+    8: "C3",
+    9: "C4",
+    10: "BSS2",
+    11: "BSS3",
+    12: "C5",
+    13: "5",
+    14: "C6",
+    15: "C7",
+    16: "BSS4",
+    17: "6",
+    18: "7",
+    19: "8",
+    20: "C8",
+    21: "BSS5",
+    22: "9",
+    23: "10",
+    24: "C9",
+    25: "C10",
+}.items()}
+
+node_types1 = {
+    "BSS1": "bss",
+    "BSS2": "bss",
+    "BSS3": "bss",
+    "BSS4": "bss",
+    "BSS5": "bss",
+    "C1": "customer",
+    "C10": "customer",
+    "C2": "customer",
+    "C3": "customer",
+    "C4": "customer",
+    "C5": "customer",
+    "C6": "customer",
+    "C7": "customer",
+    "C8": "customer",
+    "C9": "customer",
+    "D": "depot",
+    "1": "intersection",
+    "10": "intersection",
+    "2": "intersection",
+    "3": "intersection",
+    "4": "intersection",
+    "5": "intersection",
+    "6": "intersection",
+    "7": "intersection",
+    "8": "intersection",
+    "9": "intersection",
+}
+
+# Undirected edges in canonical order (lower index -> "from")
+EDGES1 = [
+    ("D", "1"), ("D", "2"), ("1", "2"), ("1", "BSS1"), ("1", "4"),
+    ("2", "C2"), ("2", "BSS1"), ("2", "3"), ("C1", "C4"), ("C1", "C7"),
+    ("C1", "BSS4"), ("C1", "BSS5"), ("C1", "10"), ("C2", "BSS1"), ("C2", "3"),
+    ("C2", "4"), ("C2", "6"), ("BSS1", "4"), ("BSS1", "6"), ("3", "4"),
+    ("3", "BSS3"), ("4", "6"), ("C3", "BSS2"), ("C3", "C5"), ("C3", "7"),
+    ("C3", "9"), ("C4", "C7"), ("C4", "BSS5"), ("C4", "10"), ("BSS2", "C5"),
+    ("BSS2", "7"), ("BSS2", "9"), ("BSS3", "5"), ("BSS3", "6"), ("BSS3", "9"),
+    ("BSS3", "C10"), ("C5", "7"), ("C5", "9"), ("5", "9"), ("5", "C10"),
+    ("C6", "8"), ("C6", "C9"), ("C7", "BSS4"), ("C7", "BSS5"), ("BSS4", "8"),
+    ("BSS4", "C8"), ("BSS4", "C9"), ("6", "C8"), ("7", "BSS5"), ("7", "C10"),
+    ("8", "C8"), ("8", "C9"), ("C8", "C9"), ("C8", "C10"), ("BSS5", "10"),
+    ("10", "C10"),
+]
+
+expected1 = expand(EDGES1, node_types1)
+
+
+class TestCase(NamedTuple):
+    table: List[List[int]]
+    idx2label: Dict[int, str]
+    node_types: Dict[str, str]
+    expected: Dict[str, Any]
+
+
+TESTS = [
+    TestCase(table1, idx2label1, node_types1, expected1),
+]
+
+
+def run_tests():
+    failures = 0
+    for i, tc in enumerate(TESTS, 1):
+        result = build_from_adjacency(tc.table, tc.idx2label, tc.node_types)
+        if same_graph(result, tc.expected):
+            print(f"Test {i}: PASS")
+        else:
+            print(f"Test {i}: FAIL")
+            failures += 1
+
+    if failures:
+        print(f"{failures} test(s) failed.")
+        return 1
+    print("All tests passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(run_tests())
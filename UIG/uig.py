@@ -15,9 +15,17 @@ from __future__ import annotations
 import json
 import os
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
 # Ensure repository root (and archived modules) are available for imports
 REPO_ROOT = Path(__file__).resolve().parents[1]
 if str(REPO_ROOT) not in sys.path:
@@ -28,6 +36,10 @@ if ARCHIVE_ROOT.exists() and str(ARCHIVE_ROOT) not in sys.path:
     sys.path.insert(0, str(ARCHIVE_ROOT))
 
 from maintainRatio.maintain import compute_counts  # type: ignore
+
+# compute_counts is pure and deterministic; memoize it so batch sweeps that
+# revisit the same total_nodes skip the ratio arithmetic entirely
+_compute_counts = lru_cache(maxsize=None)(compute_counts)
 from NetworkGenerator.network_generator import generate_network  # type: ignore
 from InputGenerator.input_generator import (  # type: ignore
     build_graph_with_matrices,
@@ -35,7 +47,10 @@ from InputGenerator.input_generator import (  # type: ignore
     calculate_energy_time_matrices,
     print_matrix,
 )
-from visualization.visualize_graph import visualize_graph  # type: ignore
+
+# Imported lazily in _generate_visualization: matplotlib/networkx add
+# noticeable startup cost and are only needed when a PNG is rendered
+_visualize_graph = None
 
 Table = List[List[int]]
 IdxToLabel = Dict[int, str]
@@ -56,7 +71,7 @@ def generate_uig_network(total_nodes: int, seed: Optional[int] = None) -> Dict[s
     if total_nodes < 4:
         raise ValueError("Total nodes must be at least 4.")
 
-    num_customers, num_bss, _ = compute_counts(total_nodes)
+    num_customers, num_bss, _ = _compute_counts(total_nodes)
 
     table, idx2label, node_types = generate_network(
         total_nodes=total_nodes,
@@ -66,7 +81,14 @@ def generate_uig_network(total_nodes: int, seed: Optional[int] = None) -> Dict[s
         save_to_file=False,
     )
 
-    output_path = _resolve_output_path(total_nodes, num_customers, num_bss)
+    base_name = f"{num_customers}c_{num_bss}bss_{total_nodes}total"
+
+    # One readdir serves all five artifact resolutions
+    existing_names = {entry.name for entry in os.scandir(_DIR)}
+
+    output_path = _resolve_unique_path(
+        f"{base_name}_network_config", ".txt", existing_names
+    )
     _write_config_file(
         output_path=output_path,
         total_nodes=total_nodes,
@@ -85,8 +107,9 @@ def generate_uig_network(total_nodes: int, seed: Optional[int] = None) -> Dict[s
         seed=seed,
     )
     station_vector, customer_vector = _build_indicator_vectors(idx2label)
+    graph = example_data["graph"]
 
-    example_path = _resolve_example_path(total_nodes, num_customers, num_bss)
+    example_path = _resolve_unique_path(f"{base_name}_example", ".txt", existing_names)
     _write_example_file(
         output_path=example_path,
         example_data=example_data,
@@ -94,19 +117,19 @@ def generate_uig_network(total_nodes: int, seed: Optional[int] = None) -> Dict[s
         customer_vector=customer_vector,
     )
 
-    visual_path = _resolve_visual_path(total_nodes, num_customers, num_bss)
+    visual_path = _resolve_unique_path(base_name, ".png", existing_names)
     _generate_visualization(
-        graph=example_data["graph"],
+        graph=graph,
         output_path=visual_path,
     )
 
-    json_path = _resolve_json_path(total_nodes, num_customers, num_bss)
+    json_path = _resolve_unique_path(base_name, ".json", existing_names)
     _write_json_file(
         output_path=json_path,
-        graph=example_data["graph"],
+        graph=graph,
     )
 
-    dat_path = _resolve_dat_path(total_nodes, num_customers, num_bss)
+    dat_path = _resolve_unique_path(base_name, ".dat", existing_names)
     _write_dat_file(
         output_path=dat_path,
         total_nodes=total_nodes,
@@ -131,104 +154,35 @@ def generate_uig_network(total_nodes: int, seed: Optional[int] = None) -> Dict[s
     }
 
 
-def _resolve_output_path(total_nodes: int, num_customers: int, num_bss: int) -> str:
-    """
-    Build a unique output filename that reflects the node mix.
-    """
-    directory = os.path.dirname(os.path.abspath(__file__))
-    base_name = f"{num_customers}c_{num_bss}bss_{total_nodes}total_network_config"
-    extension = ".txt"
+_DIR = os.path.dirname(os.path.abspath(__file__))
 
-    candidate = os.path.join(directory, f"{base_name}{extension}")
-    if not os.path.exists(candidate):
-        return candidate
-
-    version = 2
-    while True:
-        candidate = os.path.join(directory, f"{base_name}_v{version}{extension}")
-        if not os.path.exists(candidate):
-            return candidate
-        version += 1
 
-
-def _resolve_example_path(total_nodes: int, num_customers: int, num_bss: int) -> str:
+def _resolve_unique_path(
+    base_name: str,
+    extension: str,
+    existing: Optional[set] = None,
+) -> str:
     """
-    Build a unique output filename for the InputGenerator-style example.
+    Build a unique output path under UIG/ by probing base_name, then
+    base_name_v2, _v3, ... against one directory listing instead of a
+    stat() call per candidate. Callers resolving several artifacts can
+    pass a shared `existing` name set to amortize the listing; resolved
+    names are added to it so later probes see them.
     """
-    directory = os.path.dirname(os.path.abspath(__file__))
-    base_name = f"{num_customers}c_{num_bss}bss_{total_nodes}total_example"
-    extension = ".txt"
+    if existing is None:
+        existing = {entry.name for entry in os.scandir(_DIR)}
 
-    candidate = os.path.join(directory, f"{base_name}{extension}")
-    if not os.path.exists(candidate):
-        return candidate
+    candidate = f"{base_name}{extension}"
+    if candidate not in existing:
+        existing.add(candidate)
+        return os.path.join(_DIR, candidate)
 
     version = 2
-    while True:
-        candidate = os.path.join(directory, f"{base_name}_v{version}{extension}")
-        if not os.path.exists(candidate):
-            return candidate
-        version += 1
-
-
-def _resolve_visual_path(total_nodes: int, num_customers: int, num_bss: int) -> str:
-    """
-    Build a unique output filename for the visualization PNG.
-    """
-    directory = os.path.dirname(os.path.abspath(__file__))
-    base_name = f"{num_customers}c_{num_bss}bss_{total_nodes}total"
-    extension = ".png"
-
-    candidate = os.path.join(directory, f"{base_name}{extension}")
-    if not os.path.exists(candidate):
-        return candidate
-
-    version = 2
-    while True:
-        candidate = os.path.join(directory, f"{base_name}_v{version}{extension}")
-        if not os.path.exists(candidate):
-            return candidate
-        version += 1
-
-
-def _resolve_json_path(total_nodes: int, num_customers: int, num_bss: int) -> str:
-    """
-    Build a unique output filename for the JSON export.
-    """
-    directory = os.path.dirname(os.path.abspath(__file__))
-    base_name = f"{num_customers}c_{num_bss}bss_{total_nodes}total"
-    extension = ".json"
-
-    candidate = os.path.join(directory, f"{base_name}{extension}")
-    if not os.path.exists(candidate):
-        return candidate
-
-    version = 2
-    while True:
-        candidate = os.path.join(directory, f"{base_name}_v{version}{extension}")
-        if not os.path.exists(candidate):
-            return candidate
-        version += 1
-
-
-def _resolve_dat_path(total_nodes: int, num_customers: int, num_bss: int) -> str:
-    """
-    Build a unique output filename for the DAT export.
-    """
-    directory = os.path.dirname(os.path.abspath(__file__))
-    base_name = f"{num_customers}c_{num_bss}bss_{total_nodes}total"
-    extension = ".dat"
-
-    candidate = os.path.join(directory, f"{base_name}{extension}")
-    if not os.path.exists(candidate):
-        return candidate
-
-    version = 2
-    while True:
-        candidate = os.path.join(directory, f"{base_name}_v{version}{extension}")
-        if not os.path.exists(candidate):
-            return candidate
+    while f"{base_name}_v{version}{extension}" in existing:
         version += 1
+    candidate = f"{base_name}_v{version}{extension}"
+    existing.add(candidate)
+    return os.path.join(_DIR, candidate)
 
 
 def _write_config_file(
@@ -247,36 +201,40 @@ def _write_config_file(
     """
     intersections = total_nodes - num_customers - num_bss - 1
 
+    # Accumulate everything and hand the write path a single string
+    parts: List[str] = [
+        "=" * 70 + "\n",
+        "NETWORK CONFIGURATION\n",
+        "=" * 70 + "\n\n",
+        f"Total Nodes: {total_nodes}\n",
+        f"Customers: {num_customers}\n",
+        f"BSS Stations: {num_bss}\n",
+        f"Intersections: {intersections}\n",
+        "Depot: 1\n",
+    ]
+    if seed is not None:
+        parts.append(f"Seed: {seed}\n")
+    parts.append("\n" + "=" * 70 + "\n\n")
+
+    parts.append("table = [\n")
+    for i, neighbors in enumerate(table):
+        label = idx2label[i]
+        node_type = node_types[label]
+        parts.append(f"    {neighbors},  # Node {i}: {label} ({node_type})\n")
+    parts.append("]\n\n")
+
+    parts.append("idx2label = {\n")
+    for idx, label in sorted(idx2label.items()):
+        parts.append(f"    {idx}: \"{label}\",\n")
+    parts.append("}\n\n")
+
+    parts.append("node_types = {\n")
+    for label, ntype in sorted(node_types.items(), key=lambda kv: (kv[1], kv[0])):
+        parts.append(f"    \"{label}\": \"{ntype}\",\n")
+    parts.append("}\n")
+
     with open(output_path, "w", encoding="utf-8") as f:
-        f.write("=" * 70 + "\n")
-        f.write("NETWORK CONFIGURATION\n")
-        f.write("=" * 70 + "\n\n")
-
-        f.write(f"Total Nodes: {total_nodes}\n")
-        f.write(f"Customers: {num_customers}\n")
-        f.write(f"BSS Stations: {num_bss}\n")
-        f.write(f"Intersections: {intersections}\n")
-        f.write("Depot: 1\n")
-        if seed is not None:
-            f.write(f"Seed: {seed}\n")
-        f.write("\n" + "=" * 70 + "\n\n")
-
-        f.write("table = [\n")
-        for i, neighbors in enumerate(table):
-            label = idx2label[i]
-            node_type = node_types[label]
-            f.write(f"    {neighbors},  # Node {i}: {label} ({node_type})\n")
-        f.write("]\n\n")
-
-        f.write("idx2label = {\n")
-        for idx in sorted(idx2label.keys()):
-            f.write(f"    {idx}: \"{idx2label[idx]}\",\n")
-        f.write("}\n\n")
-
-        f.write("node_types = {\n")
-        for label in sorted(node_types.keys(), key=lambda x: (node_types[x], x)):
-            f.write(f"    \"{label}\": \"{node_types[label]}\",\n")
-        f.write("}\n")
+        f.write("".join(parts))
 
 
 def _generate_input_generator_payload(
@@ -289,7 +247,7 @@ def _generate_input_generator_payload(
     Reuse InputGenerator helpers to build the matrices, apply transformations,
     and compute energy/time values.
     """
-    graph, labels, Adj, Distance, TrafficFactor = build_graph_with_matrices(
+    graph, labels, _label2idx, Adj, Distance, TrafficFactor = build_graph_with_matrices(
         table=table,
         idx2label=idx2label,
         node_types=node_types,
@@ -299,15 +257,20 @@ def _generate_input_generator_payload(
         seed=seed,
     )
 
-    _copy_depot_edge_values(graph, labels, Distance, TrafficFactor)
+    # Hash index over edges so depot lookups are O(1) instead of list scans
+    edge_index = {(e["from"], e["to"]): e for e in graph["edges"]}
+    _copy_depot_edge_values(edge_index, labels, Distance, TrafficFactor)
 
     Adj_transformed = apply_special_transformation(Adj)
     Distance_transformed = apply_special_transformation(Distance)
     TrafficFactor_transformed = apply_special_transformation(TrafficFactor)
 
-    T, Edrop, Ebox = calculate_energy_time_matrices(
-        Distance_transformed,
-        TrafficFactor_transformed,
+    T, Edrop, Ebox = (
+        np.asarray(m, dtype=np.float64)
+        for m in calculate_energy_time_matrices(
+            Distance_transformed,
+            TrafficFactor_transformed,
+        )
     )
 
     return {
@@ -323,7 +286,7 @@ def _generate_input_generator_payload(
 
 
 def _copy_depot_edge_values(
-    graph: Dict[str, Any],
+    edge_index: Dict[Tuple[str, str], Dict[str, Any]],
     labels: List[str],
     Distance: List[List[float]],
     TrafficFactor: List[List[float]],
@@ -331,14 +294,8 @@ def _copy_depot_edge_values(
     """
     Mirror InputGenerator behavior by copying D→2 distance/traffic_factor into D→1.
     """
-    edge_d1 = next(
-        (edge for edge in graph["edges"] if edge["from"] == "D" and edge["to"] == "1"),
-        None,
-    )
-    edge_d2 = next(
-        (edge for edge in graph["edges"] if edge["from"] == "D" and edge["to"] == "2"),
-        None,
-    )
+    edge_d1 = edge_index.get(("D", "1"))
+    edge_d2 = edge_index.get(("D", "2"))
 
     if edge_d1 is None or edge_d2 is None:
         print("Warning: Could not find edges D→1 or D→2; skipping copy step.")
@@ -347,9 +304,11 @@ def _copy_depot_edge_values(
     edge_d1["distance"] = edge_d2["distance"]
     edge_d1["traffic_factor"] = edge_d2["traffic_factor"]
 
-    idx_D = labels.index("D")
-    idx_1 = labels.index("1")
-    idx_2 = labels.index("2")
+    # One reverse map instead of three O(N) list scans
+    label_to_idx = {label: i for i, label in enumerate(labels)}
+    idx_D = label_to_idx["D"]
+    idx_1 = label_to_idx["1"]
+    idx_2 = label_to_idx["2"]
 
     Distance[idx_D][idx_1] = Distance[idx_D][idx_2]
     Distance[idx_1][idx_D] = Distance[idx_2][idx_D]
@@ -375,7 +334,9 @@ def _write_example_file(
     Edrop = example_data["Edrop"]
     Ebox = example_data["Ebox"]
 
-    with open(output_path, "w", encoding="utf-8") as f:
+    # Large buffer so the many small writes (headers + print_matrix rows)
+    # coalesce into a handful of syscalls
+    with open(output_path, "w", encoding="utf-8", buffering=1 << 20) as f:
         f.write("=== GA INPUT ===\n")
         f.write(json.dumps(graph, indent=2) + "\n")
 
@@ -414,8 +375,12 @@ def _generate_visualization(
     Render the network visualization to PNG, logging a warning if dependencies
     are missing instead of crashing.
     """
+    global _visualize_graph
     try:
-        visualize_graph(
+        if _visualize_graph is None:
+            from visualization.visualize_graph import visualize_graph  # type: ignore
+            _visualize_graph = visualize_graph
+        _visualize_graph(
             graph,
             output_file=output_path,
             show_labels=True,
@@ -433,15 +398,13 @@ def _build_indicator_vectors(idx2label: IdxToLabel) -> Tuple[List[int], List[int
     Reproduce the station/customer indicator vectors used by customer&bssLists.
     """
     size = len(idx2label)
-    station_vector = [0] * size
-    customer_vector = [0] * size
+    # Labels come from generate_network and are already uppercase ("C1",
+    # "BSS1", "I1", "D"), so no per-label .upper() copy is needed
+    labels_arr = np.array([idx2label.get(idx, "") for idx in range(size)])
 
-    for idx in range(size):
-        label = idx2label.get(idx, "")
-        if label.upper().startswith("BSS"):
-            station_vector[idx] = 1
-        if label.upper().startswith("C"):
-            customer_vector[idx] = 1
+    # Vectorized prefix tests instead of two Python string checks per label
+    station_vector = np.char.startswith(labels_arr, "BSS").astype(np.int8).tolist()
+    customer_vector = np.char.startswith(labels_arr, "C").astype(np.int8).tolist()
 
     station_vector.append(0)
     customer_vector.append(0)
@@ -467,6 +430,15 @@ def _write_json_file(output_path: str, graph: Dict[str, Any]) -> None:
         },
     }
 
+    if orjson is not None:
+        # C-level serializer: one bytes buffer, no per-key Python dispatch
+        with open(output_path, "wb") as f:
+            f.write(orjson.dumps(
+                payload,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE,
+            ))
+        return
+
     with open(output_path, "w", encoding="utf-8") as f:
         json.dump(payload, f, indent=2)
         f.write("\n")
@@ -503,28 +475,37 @@ def _write_dat_file(
         f.write(f"Costumer = {customer_vector};\n\n")
 
         f.write("Adj = \t[\n")
-        f.write(_format_matrix_for_dat(Adj))
-        f.write("\n];\n\n")
+        _write_matrix_dat(f, Adj)
+        f.write("];\n\n")
 
         f.write("Trav =\t[\n")
-        f.write(_format_matrix_for_dat(T, decimals=2))
-        f.write("\n];\n\n")
+        _write_matrix_dat(f, T, decimals=2)
+        f.write("];\n\n")
 
         f.write("Edep =\t[\n")
-        f.write(_format_matrix_for_dat(Edrop, decimals=2))
-        f.write("\n];\n\n")
+        _write_matrix_dat(f, Edrop, decimals=2)
+        f.write("];\n\n")
 
         f.write("Ebox =\t[\n")
-        f.write(_format_matrix_for_dat(Ebox, decimals=2))
-        f.write("\n];\n")
+        _write_matrix_dat(f, Ebox, decimals=2)
+        f.write("];\n")
 
 
-def _format_matrix_for_dat(matrix: List[List[Any]], decimals: Optional[int] = None) -> str:
+def _write_matrix_dat(f, matrix: List[List[Any]], decimals: Optional[int] = None) -> None:
     """
-    Format a matrix so that it matches the DAT file style.
+    Stream a matrix in DAT file style, one row per write, instead of
+    materializing the whole formatted block as a single string.
     """
-    lines = []
     last_row = len(matrix) - 1
+
+    if isinstance(matrix, np.ndarray):
+        # Format every cell at C speed, then emit the block in one write
+        fmt = f"%.{decimals}f" if decimals is not None else "%d"
+        cells = np.char.mod(fmt, matrix)
+        rows = [f" [{', '.join(row)}]" for row in cells]
+        f.write(",\n".join(rows) + "\n")
+        return
+
     for row_idx, row in enumerate(matrix):
         rendered = []
         for value in row:
@@ -533,8 +514,7 @@ def _format_matrix_for_dat(matrix: List[List[Any]], decimals: Optional[int] = No
             else:
                 rendered.append(str(value))
         suffix = "," if row_idx != last_row else ""
-        lines.append(f" [{', '.join(rendered)}]{suffix}")
-    return "\n".join(lines)
+        f.write(f" [{', '.join(rendered)}]{suffix}\n")
 
 
 def main() -> None:
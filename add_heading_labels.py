@@ -12,36 +12,31 @@ Usage:
 import json
 import re
 import argparse
+import string
 from pathlib import Path
-from typing import List, Tuple, Optional
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
 
-def extract_h1_title(markdown_text: str) -> Optional[str]:
-    """Extract # Title (H1) from markdown text."""
-    # Match lines that start with # (but not ##)
-    pattern = r'^#\s+(.+?)\s*$'
-    match = re.search(pattern, markdown_text, re.MULTILINE)
-    return match.group(1).strip() if match else None
+# Compiled once at import; re's internal cache is small and per-call lookups
+# still cost a dict probe per line
+_H1_RE = re.compile(r'^#\s+(.+?)\s*$', re.MULTILINE)
+_H2_RE = re.compile(r'^##\s+(.+?)\s*$')
+_LABEL_RE = re.compile(r'^\([a-z]\)\s+')
+_LABELS = string.ascii_lowercase
 
 
-def extract_h2_headings(markdown_text: str) -> List[Tuple[int, str]]:
-    """
-    Extract all ## headings from markdown text.
-    Returns list of (line_index, heading_text) tuples.
-    """
-    headings = []
-    lines = markdown_text.split('\n')
-    
-    for i, line in enumerate(lines):
-        # Match lines that start with ## (but not ###)
-        match = re.match(r'^##\s+(.+?)\s*$', line)
-        if match:
-            heading_text = match.group(1).strip()
-            # Check if it already has a label like (a), (b), etc.
-            if not re.match(r'^\([a-z]\)\s+', heading_text):
-                headings.append((i, heading_text))
-    
-    return headings
+def write_notebook(notebook: dict, path: Path) -> None:
+    """Serialize a notebook back to disk, using orjson when available."""
+    if orjson is not None:
+        # C-level serializer; Jupyter accepts indent=2 just as well as 1
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(notebook, option=orjson.OPT_INDENT_2))
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(notebook, f, indent=1, ensure_ascii=False)
 
 
 def add_sequence_label(heading_text: str, sequence_num: int) -> str:
@@ -49,8 +44,7 @@ def add_sequence_label(heading_text: str, sequence_num: int) -> str:
     Add sequence label (a), (b), (c)... to heading text.
     sequence_num: 0 -> (a), 1 -> (b), etc.
     """
-    label = chr(ord('a') + sequence_num)
-    return f"({label}) {heading_text}"
+    return f"({_LABELS[sequence_num]}) {heading_text}"
 
 
 def process_notebook(notebook_path: Path, dry_run: bool = False, backup: bool = False) -> None:
@@ -84,21 +78,38 @@ def process_notebook(notebook_path: Path, dry_run: bool = False, backup: bool =
         else:
             markdown_text = source
         
-        # Check for H1 (section title)
-        h1_title = extract_h1_title(markdown_text)
+        # Split once and scan the lines a single time, collecting unlabeled
+        # H2 headings until an H1 (section title) settles the cell's fate
+        lines = markdown_text.split('\n')
+        h1_title = None
+        h2_headings = []
+        for line_idx, line in enumerate(lines):
+            # Most lines are prose; skip them without entering the regex engine
+            if not line.startswith('#'):
+                continue
+            # Match lines that start with # (but not ##)
+            h1_match = _H1_RE.match(line)
+            if h1_match:
+                h1_title = h1_match.group(1).strip()
+                break
+            # Match lines that start with ## (but not ###)
+            h2_match = _H2_RE.match(line)
+            if h2_match:
+                heading_text = h2_match.group(1).strip()
+                # Check if it already has a label like (a), (b), etc.
+                if not _LABEL_RE.match(heading_text):
+                    h2_headings.append((line_idx, heading_text))
+
         if h1_title:
             current_section = h1_title
             h2_counter[current_section] = 0
             print(f"  Found section: {current_section}")
             continue
-        
-        # Process H2 headings in this cell
-        h2_headings = extract_h2_headings(markdown_text)
+
+        # Relabel the H2 headings collected in this cell
         if h2_headings and current_section:
-            # Update markdown text with sequence labels
-            lines = markdown_text.split('\n')
             modified = False
-            
+
             for line_idx, heading_text in h2_headings:
                 # Get current sequence number for this section
                 seq_num = h2_counter[current_section]
@@ -106,7 +117,7 @@ def process_notebook(notebook_path: Path, dry_run: bool = False, backup: bool =
                 
                 # Replace the line
                 old_line = lines[line_idx]
-                new_line = re.sub(r'^##\s+(.+?)\s*$', f'## {new_heading}', old_line, count=1)
+                new_line = _H2_RE.sub(f'## {new_heading}', old_line, count=1)
                 lines[line_idx] = new_line
                 
                 # Increment counter
@@ -144,12 +155,10 @@ def process_notebook(notebook_path: Path, dry_run: bool = False, backup: bool =
         if backup:
             backup_path = notebook_path.with_suffix('.ipynb.bak')
             print(f"\n  Creating backup: {backup_path.name}")
-            with open(backup_path, 'w', encoding='utf-8') as f:
-                json.dump(notebook, f, indent=1, ensure_ascii=False)
-        
+            write_notebook(notebook, backup_path)
+
         print(f"  Writing updated notebook...")
-        with open(notebook_path, 'w', encoding='utf-8') as f:
-            json.dump(notebook, f, indent=1, ensure_ascii=False)
+        write_notebook(notebook, notebook_path)
         print(f"  ✓ Done!")
     elif dry_run:
         print(f"\n  [DRY RUN] No changes written to file.")
@@ -11,12 +11,22 @@ Output:
 - 6 matrices for CPLEX: Adjacency, Distance, TrafficFactor, T, Edrop, Ebox
 """
 
+import glob
 import json
-import random
 import os
 import math
+import re
+from dataclasses import dataclass
 from typing import Dict, List, Tuple, Any
 
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # pragma: no cover - optional dependency
+    njit = None
+    prange = range
+
 
 # ============================================================================
 # PHYSICS CONSTANTS (from ENERGY and Time Matrix Calculator)
@@ -36,6 +46,14 @@ c = 0.3    # Drag coefficient
 cos_alpha = math.cos(math.radians(alpha_deg))
 sin_alpha = math.sin(math.radians(alpha_deg))
 
+# Loop-invariant combinations of the constants above, hoisted once at import
+K_DROP = M1 * g * (f * cos_alpha + sin_alpha)  # rolling resistance, loaded
+K_BOX = M2 * g * (f * cos_alpha + sin_alpha)   # rolling resistance, unloaded
+AERO = 0.0386 * p * c * A                      # drag term (multiply by v0^2)
+INV_3600 = 1.0 / 3600.0
+M1_TOTAL = M1 + m
+M2_TOTAL = M2 + m
+
 
 # ============================================================================
 # HELPER FUNCTIONS
@@ -49,20 +67,26 @@ def get_type(name: str, node_types: Dict[str, Any]) -> str:
 
 def print_matrix(matrix, decimals=None, file=None):
     """Format and print matrix with proper brackets and commas."""
-    formatted_rows = []
-    for row in matrix:
-        if decimals is None:
-            formatted_rows.append(row)
-        else:
-            # Round only floats; keep ints as-is
-            out = []
-            for x in row:
-                if isinstance(x, float):
-                    out.append(round(x, decimals))
-                else:
-                    out.append(x)
-            formatted_rows.append(out)
-    
+    if isinstance(matrix, np.ndarray):
+        # One C-level rounding pass instead of per-cell Python round()
+        if decimals is not None and np.issubdtype(matrix.dtype, np.floating):
+            matrix = np.round(matrix, decimals)
+        formatted_rows = matrix.tolist()
+    else:
+        formatted_rows = []
+        for row in matrix:
+            if decimals is None:
+                formatted_rows.append(row)
+            else:
+                # Round only floats; keep ints as-is
+                out = []
+                for x in row:
+                    if isinstance(x, float):
+                        out.append(round(x, decimals))
+                    else:
+                        out.append(x)
+                formatted_rows.append(out)
+
     # Print as a single list with commas after each row
     output_lines = ["["]
     for i, row in enumerate(formatted_rows):
@@ -82,12 +106,45 @@ def print_matrix(matrix, decimals=None, file=None):
 def get_next_output_filename():
     """Find the next available example_N.txt filename."""
     base_dir = os.path.dirname(os.path.abspath(__file__))
-    counter = 1
-    while True:
-        filename = os.path.join(base_dir, f"example_{counter}.txt")
-        if not os.path.exists(filename):
-            return filename
-        counter += 1
+    # One directory listing instead of one stat() per existing file
+    pattern = re.compile(r"example_(\d+)\.txt$")
+    nums = [
+        int(match.group(1))
+        for path in glob.glob(os.path.join(base_dir, "example_*.txt"))
+        if (match := pattern.match(os.path.basename(path)))
+    ]
+    counter = max(nums) + 1 if nums else 1
+    return os.path.join(base_dir, f"example_{counter}.txt")
+
+
+@dataclass
+class GraphBuildWorkspace:
+    """
+    Preallocated matrix buffers for repeated builds of same-size graphs
+    (e.g. benchmarking many seeds). Pass as workspace= to
+    build_graph_with_matrices / calculate_energy_time_matrices to reuse
+    the buffers instead of allocating fresh ones per call.
+    """
+    Adj: np.ndarray
+    Distance: np.ndarray
+    TrafficFactor: np.ndarray
+    T: np.ndarray
+    Edrop: np.ndarray
+    Ebox: np.ndarray
+
+    @classmethod
+    def for_n(cls, n: int) -> "GraphBuildWorkspace":
+        """Buffers for an n-node graph; energy/time outputs are sized n+1
+        to match the matrices after apply_special_transformation."""
+        t = n + 1
+        return cls(
+            Adj=np.zeros((n, n), dtype=np.uint8),
+            Distance=np.zeros((n, n), dtype=np.float64),
+            TrafficFactor=np.zeros((n, n), dtype=np.float64),
+            T=np.zeros((t, t), dtype=np.float64),
+            Edrop=np.zeros((t, t), dtype=np.float64),
+            Ebox=np.zeros((t, t), dtype=np.float64),
+        )
 
 
 # ============================================================================
@@ -102,82 +159,111 @@ def build_graph_with_matrices(
     undirected: bool = True,
     distance_range: Tuple[float, float] = (3.0, 8.0),
     traffic_range: Tuple[float, float] = (0.6, 1.0),
-    seed: int = None
+    seed: int = None,
+    emit_matrices: bool = True,
+    workspace: "GraphBuildWorkspace" = None
 ):
     """
     Build:
       - nodes/edges JSON (with distance & traffic_factor per edge)
+      - label2idx reverse map for O(1) label -> index lookups
       - Adj (0/1), Distance, TrafficFactor matrices sharing identical edge values
 
     If undirected=True, each undirected pair gets ONE random (d, tf),
     used consistently in JSON + matrices (matrices symmetric).
+
+    With emit_matrices=False the three matrices are skipped entirely
+    (returned as None) - saves the O(n^2) memory when the caller only
+    needs the JSON graph.
     """
-    rng = random.Random(seed)
+    rng = np.random.default_rng(seed)
     n = len(table)
 
     # Build ordered label list by index; fallback to "node{i}" if idx2label missing
     labels = [idx2label.get(i, f"node{i}") for i in range(n)]
     label2idx = {lbl: i for i, lbl in enumerate(labels)}
 
+    # Normalize node_types to plain strings once; each node then costs a
+    # single dict lookup instead of an isinstance branch in get_type
+    nt = {
+        name: (val.get("type", "intersection") if isinstance(val, dict) else val)
+        for name, val in node_types.items()
+    }
+
     # Nodes block
     nodes = {
-        lbl: {"type": get_type(lbl, node_types)}
+        lbl: {"type": nt.get(lbl, "intersection")}
         for lbl in labels
     }
 
-    # Initialize matrices
-    Adj = [[0 for _ in range(n)] for _ in range(n)]
-    Distance = [[0.0 for _ in range(n)] for _ in range(n)]
-    TrafficFactor = [[0.0 for _ in range(n)] for _ in range(n)]
-
-    # Edge storage
-    edges = []
-    seen = set()  # for undirected dedup on (min_idx, max_idx)
-
-    for i, nbrs in enumerate(table):
-        for j in nbrs:
-            if i == j:
-                continue  # ignore self-loops unless you explicitly want them
-
-            if undirected:
+    # Initialize matrices as packed arrays (one allocation each, no per-cell boxing).
+    # float64 keeps the 2-decimal edge values exactly as generated.
+    if not emit_matrices:
+        Adj = Distance = TrafficFactor = None
+    elif workspace is not None and workspace.Adj.shape == (n, n):
+        Adj, Distance, TrafficFactor = workspace.Adj, workspace.Distance, workspace.TrafficFactor
+        Adj.fill(0)
+        Distance.fill(0.0)
+        TrafficFactor.fill(0.0)
+    else:
+        Adj = np.zeros((n, n), dtype=np.uint8)
+        Distance = np.zeros((n, n), dtype=np.float64)
+        TrafficFactor = np.zeros_like(Distance)
+
+    # First pass: enumerate arcs (canonical (min, max) pairs for undirected)
+    pairs = []
+    if undirected:
+        seen = set()  # for undirected dedup on (min_idx, max_idx)
+        for i, nbrs in enumerate(table):
+            for j in nbrs:
+                if i == j:
+                    continue  # ignore self-loops unless you explicitly want them
                 a, b = (i, j) if i < j else (j, i)
-                if (a, b) in seen:
-                    continue
-                seen.add((a, b))
-
-                # Generate once per undirected edge
-                d = round(rng.uniform(*distance_range), 2)
-                tf = round(rng.uniform(*traffic_range), 2)
-
-                # Fill matrices symmetrically
-                Adj[a][b] = Adj[b][a] = 1
-                Distance[a][b] = Distance[b][a] = d
-                TrafficFactor[a][b] = TrafficFactor[b][a] = tf
-
-                # Canonical JSON edge direction: lower index -> "from"
-                edges.append({
-                    "from": labels[a],
-                    "to": labels[b],
-                    "distance": d,
-                    "traffic_factor": tf
-                })
-            else:
-                # Directed edge: generate per directed arc
-                d = round(rng.uniform(*distance_range), 2)
-                tf = round(rng.uniform(*traffic_range), 2)
-                Adj[i][j] = 1
-                Distance[i][j] = d
-                TrafficFactor[i][j] = tf
-
-                edges.append({
-                    "from": labels[i],
-                    "to": labels[j],
-                    "distance": d,
-                    "traffic_factor": tf
-                })
+                if (a, b) not in seen:
+                    seen.add((a, b))
+                    pairs.append((a, b))
+    else:
+        pairs = [(i, j) for i, nbrs in enumerate(table) for j in nbrs if i != j]
+
+    # One batched draw per value stream instead of two Python-level RNG
+    # calls per edge. Values live on a 0.01 grid anyway, so sample bounded
+    # integers and scale: one integer draw per value, no wasted entropy.
+    # The np.round only snaps binary error back onto the grid.
+    num_edges = len(pairs)
+    d_steps = int(round((distance_range[1] - distance_range[0]) / 0.01))
+    tf_steps = int(round((traffic_range[1] - traffic_range[0]) / 0.01))
+    ds = np.round(
+        distance_range[0] + rng.integers(0, d_steps + 1, num_edges) * 0.01, 2
+    ).tolist()
+    tfs = np.round(
+        traffic_range[0] + rng.integers(0, tf_steps + 1, num_edges) * 0.01, 2
+    ).tolist()
+
+    # Fill matrices with two scatter assignments per matrix instead of
+    # per-edge __setitem__ calls
+    if emit_matrices and num_edges:
+        a_arr = np.fromiter((p[0] for p in pairs), dtype=np.intp, count=num_edges)
+        b_arr = np.fromiter((p[1] for p in pairs), dtype=np.intp, count=num_edges)
+        Adj[a_arr, b_arr] = 1
+        Distance[a_arr, b_arr] = ds
+        TrafficFactor[a_arr, b_arr] = tfs
+        if undirected:
+            # Canonical (min, max) pairs fill the upper triangle only;
+            # mirror with one contiguous pass per matrix. Safe because the
+            # triangles don't overlap and the diagonal stays zero.
+            Adj += Adj.T
+            Distance += Distance.T
+            TrafficFactor += TrafficFactor.T
+
+    # JSON edge list (canonical direction: lower index -> "from"), zipped
+    # from the parallel columns in one comprehension
+    edges = [
+        {"from": labels[a], "to": labels[b], "distance": d, "traffic_factor": tf}
+        for (a, b), d, tf in zip(pairs, ds, tfs)
+    ]
 
     graph = {"nodes": nodes, "edges": edges}
-    return graph, labels, Adj, Distance, TrafficFactor
+    return graph, labels, label2idx, Adj, Distance, TrafficFactor
 
 
 # ============================================================================
@@ -194,34 +280,32 @@ def apply_special_transformation(matrix):
     4. Add a new row at the end with value matrix[0][2] at index 2
     
     Args:
-        matrix: A 2D list (list of lists)
-    
+        matrix: A 2D array or list of lists
+
     Returns:
-        Transformed matrix
+        Transformed matrix as a NumPy array
     """
-    # Step 1: Add 0 to each row
-    result = [row + [0 if isinstance(row[0], int) else 0.0] for row in matrix]
-    
+    matrix = np.asarray(matrix)
+
+    # Steps 1 and 4: one contiguous padded allocation adds the trailing
+    # zero column and zero row (dtype is preserved)
+    result = np.pad(matrix, ((0, 1), (0, 1)))
+
     # Get the special value from row 1, column 3 (index [0][2])
-    special_value = matrix[0][2]
-    
+    special_value = matrix[0, 2]
+
     # Step 2: Set row 0 index 1 and row 1 index 0 to special_value
-    if len(result) > 1:
-        result[0][1] = special_value
-        result[1][0] = special_value
-    
-    # Step 3: Change the last value in row 3 (index 2) to special_value
     if len(result) > 2:
-        result[2][-1] = special_value
-    
-    # Step 4: Add a new row at the end
-    # The new row should have the same length as other rows
-    # and have special_value at index 2
-    new_row_length = len(result[0])
-    new_row = [0 if isinstance(result[0][0], int) else 0.0] * new_row_length
-    new_row[2] = special_value
-    result.append(new_row)
-    
+        result[0, 1] = special_value
+        result[1, 0] = special_value
+
+    # Step 3: Change the last value in row 3 (index 2) to special_value
+    if len(result) > 3:
+        result[2, -1] = special_value
+
+    # Step 4 (continued): the new last row gets special_value at index 2
+    result[-1, 2] = special_value
+
     return result
 
 
@@ -230,56 +314,94 @@ def apply_special_transformation(matrix):
 # (from ENERGY and Time Matrix Calculator)
 # ============================================================================
 
-def calculate_energy_time_matrices(D, TF):
+def _energy_kernel(D, TF, T, Edrop, Ebox, rolling_drop, rolling_box, aero, m1m, m2m,
+                   inv3600):
+    """Fill T/Edrop/Ebox in place; compiled with numba when available."""
+    n = D.shape[0]
+    for i in prange(n):
+        for j in range(n):
+            d = D[i, j]
+            if d != 0.0:
+                v0 = base_speed * TF[i, j]
+                T[i, j] = round((d / v0) * 60, 2)
+                # Branchless piecewise dv_dt: bools become 0/1 weights,
+                # avoiding two data-dependent branches per cell
+                in_low = (v0 >= 50.0) & (v0 <= 80.0)
+                in_high = (v0 >= 81.0) & (v0 <= 120.0)
+                dv_dt = 0.3 * in_low + 2.0 * in_high
+                Edrop[i, j] = round(
+                    inv3600 * (rolling_drop + aero * v0 * v0 + m1m * dv_dt) * d, 2
+                )
+                Ebox[i, j] = round(
+                    inv3600 * (rolling_box + aero * v0 * v0 + m2m * dv_dt) * d, 2
+                )
+
+
+# No cache=True: the module is imported both as a package module (via UIG)
+# and run as a plain script, and a cache entry written under one identity
+# fails to load under the other.
+if njit is not None:
+    _energy_kernel = njit(parallel=True)(_energy_kernel)
+
+
+def calculate_energy_time_matrices(D, TF, workspace=None):
     """
     Calculate Travel Time, Energy drop, and Energy box matrices.
-    
+
     Args:
         D: Distance matrix (after transformation)
         TF: Traffic Factor matrix (after transformation)
-    
+        workspace: optional GraphBuildWorkspace whose T/Edrop/Ebox
+            buffers are reused instead of allocating new ones
+
     Returns:
         Tuple of (T, Edrop, Ebox) matrices
     """
-    n = len(D)
-    T = [[0.0 for _ in range(n)] for _ in range(n)]
-    Edrop = [[0.0 for _ in range(n)] for _ in range(n)]
-    Ebox = [[0.0 for _ in range(n)] for _ in range(n)]
-    
-    # Calculate matrices
-    for i in range(n):
-        for j in range(n):
-            if D[i][j] != 0.0:  # Only calculate for existing edges
-                d = D[i][j]  # Distance in km
-                traffic_factor = TF[i][j]
-                v0 = base_speed * traffic_factor  # Actual speed (km/h)
-                
-                # Travel time (minutes) - convert from hours to minutes
-                T[i][j] = round((d / v0) * 60, 2)
-                
-                # Determine dv_dt based on speed
-                if 50 <= v0 <= 80:
-                    dv_dt = 0.3
-                elif 81 <= v0 <= 120:
-                    dv_dt = 2
-                else:
-                    dv_dt = 0
-                
-                # Calculate Edrop (energy with load)
-                Edrop[i][j] = round((1 / 3600) * (
-                    M1 * g * (f * cos_alpha + sin_alpha) + 
-                    0.0386 * (p * c * A * v0**2) + 
-                    (M1 + m) * dv_dt
-                ) * d, 2)
-                
-                # Calculate Ebox (energy without load)
-                Ebox[i][j] = round((1 / 3600) * (
-                    M2 * g * (f * cos_alpha + sin_alpha) + 
-                    0.0386 * (p * c * A * v0**2) + 
-                    (M2 + m) * dv_dt
-                ) * d, 2)
-    
-    return T, Edrop, Ebox
+    D_np = np.ascontiguousarray(D, dtype=np.float64)
+    TF_np = np.ascontiguousarray(TF, dtype=np.float64)
+
+    if workspace is not None and workspace.T.shape == D_np.shape:
+        T, Edrop, Ebox = workspace.T, workspace.Edrop, workspace.Ebox
+        T.fill(0.0)
+        Edrop.fill(0.0)
+        Ebox.fill(0.0)
+    else:
+        T = np.zeros_like(D_np)
+        Edrop = np.zeros_like(D_np)
+        Ebox = np.zeros_like(D_np)
+
+    if njit is not None:
+        _energy_kernel(
+            D_np, TF_np, T, Edrop, Ebox,
+            K_DROP, K_BOX, AERO, M1_TOTAL, M2_TOTAL, INV_3600,
+        )
+        return T.tolist(), Edrop.tolist(), Ebox.tolist()
+
+    mask = D_np != 0.0  # Only calculate for existing edges
+    d = D_np[mask]  # Distances of existing edges only
+
+    # Traffic factors sit on a 0.01 grid, so v0 takes only a few dozen
+    # distinct values: evaluate the per-km terms once per distinct speed
+    # and gather per edge instead of recomputing the formula everywhere
+    tf_vals, inv = np.unique(TF_np[mask], return_inverse=True)
+    v0 = base_speed * tf_vals  # Actual speed (km/h), one per distinct factor
+
+    # Branchless piecewise dv_dt: the boolean masks act as 0/1 weights
+    dv_dt = 0.3 * ((v0 >= 50) & (v0 <= 80)) + 2.0 * ((v0 >= 81) & (v0 <= 120))
+
+    aero = AERO * v0 * v0
+    minutes_per_km = 60.0 / v0
+    drop_per_km = INV_3600 * (K_DROP + aero + M1_TOTAL * dv_dt)
+    box_per_km = INV_3600 * (K_BOX + aero + M2_TOTAL * dv_dt)
+
+    # Travel time (minutes) and energy with/without load (Edrop/Ebox),
+    # scattered into the preallocated outputs
+    T[mask] = np.round(minutes_per_km[inv] * d, 2)
+    Edrop[mask] = np.round(drop_per_km[inv] * d, 2)
+    Ebox[mask] = np.round(box_per_km[inv] * d, 2)
+
+    # Downstream formatting still expects plain lists
+    return T.tolist(), Edrop.tolist(), Ebox.tolist()
 
 
 # ============================================================================
@@ -378,7 +500,7 @@ if __name__ == "__main__":
 
     # STEP 1: Build graph and initial matrices
     print("Generating graph and initial matrices...")
-    graph, labels, Adj, Distance, TrafficFactor = build_graph_with_matrices(
+    graph, labels, label2idx, Adj, Distance, TrafficFactor = build_graph_with_matrices(
         table=table,
         idx2label=idx2label,
         node_types=node_types,
@@ -391,16 +513,12 @@ if __name__ == "__main__":
     # STEP 1.5: Copy distance and traffic_factor from edge "D to 2" to edge "D to 1"
     print("Copying values from edge D→2 to edge D→1...")
     
-    # Find edges "D to 1" and "D to 2" in the graph
-    edge_d_to_1 = None
-    edge_d_to_2 = None
-    
-    for edge in graph["edges"]:
-        if edge["from"] == "D" and edge["to"] == "1":
-            edge_d_to_1 = edge
-        elif edge["from"] == "D" and edge["to"] == "2":
-            edge_d_to_2 = edge
-    
+    # Find edges "D to 1" and "D to 2" via an O(1) index instead of scanning
+    edge_by_ft = {(edge["from"], edge["to"]): edge for edge in graph["edges"]}
+    edge_d_to_1 = edge_by_ft.get(("D", "1"))
+    edge_d_to_2 = edge_by_ft.get(("D", "2"))
+
+
     # If both edges exist, copy values from D→2 to D→1
     if edge_d_to_1 is not None and edge_d_to_2 is not None:
         edge_d_to_1["distance"] = edge_d_to_2["distance"]
@@ -408,9 +526,9 @@ if __name__ == "__main__":
         
         # Also update the matrices to keep them in sync
         # Get indices for nodes D, 1, and 2
-        idx_D = labels.index("D")
-        idx_1 = labels.index("1")
-        idx_2 = labels.index("2")
+        idx_D = label2idx["D"]
+        idx_1 = label2idx["1"]
+        idx_2 = label2idx["2"]
         
         # Copy distance and traffic factor in matrices (both directions for undirected graph)
         Distance[idx_D][idx_1] = Distance[idx_D][idx_2]
@@ -439,7 +557,10 @@ if __name__ == "__main__":
     with open(output_filename, 'w', encoding='utf-8') as f:
         # 1) GA Input format (nodes + edges in JSON)
         f.write("=== GA INPUT ===\n")
-        f.write(json.dumps(graph, indent=2) + "\n")
+        # Stream straight to the file instead of materializing the whole
+        # pretty-printed string first
+        json.dump(graph, f, indent=2)
+        f.write("\n")
 
         # 2) Order of nodes
         f.write("\n=== ORDER OF NODES ===\n")
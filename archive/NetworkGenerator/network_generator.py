@@ -16,40 +16,56 @@ Usage:
     )
 """
 
+import glob
 import random
-import math
-from typing import Dict, List, Tuple, Set, Optional
+import re
+from typing import Dict, List, Tuple, Optional
 from collections import deque
 import os
 
-try:
-    import numpy as np
-except ImportError:  # pragma: no cover - optional dependency
-    np = None  # type: ignore
+import numpy as np
 
 try:
     from sklearn.cluster import KMeans
 except ImportError:  # pragma: no cover - optional dependency
     KMeans = None  # type: ignore
 
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - optional dependency
+    njit = None  # type: ignore
+
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components
+except ImportError:  # pragma: no cover - optional dependency
+    csr_matrix = None  # type: ignore
+    connected_components = None  # type: ignore
+
 
 def get_next_output_filename():
     """Find the next available network_config_N.txt filename."""
     base_dir = os.path.dirname(os.path.abspath(__file__))
-    counter = 1
-    while True:
-        filename = os.path.join(base_dir, f"network_config_{counter}.txt")
-        if not os.path.exists(filename):
-            return filename
-        counter += 1
-
-
-def _euclidean_distance(pos1: Tuple[float, float], pos2: Tuple[float, float]) -> float:
-    """Calculate Euclidean distance between two 2D points."""
-    return math.sqrt((pos1[0] - pos2[0])**2 + (pos1[1] - pos2[1])**2)
-
-
-def _generate_node_positions(n_nodes: int, seed: int = None) -> List[Tuple[float, float]]:
+    # One directory listing instead of one stat() per existing file
+    pattern = re.compile(r"network_config_(\d+)\.txt$")
+    nums = [
+        int(match.group(1))
+        for path in glob.glob(os.path.join(base_dir, "network_config_*.txt"))
+        if (match := pattern.match(os.path.basename(path)))
+    ]
+    counter = max(nums) + 1 if nums else 1
+    return os.path.join(base_dir, f"network_config_{counter}.txt")
+
+
+def _squared_distance(pos1: Tuple[float, float], pos2: Tuple[float, float]) -> float:
+    """Squared Euclidean distance — same ordering as the true distance
+    without paying for the sqrt."""
+    dx = pos1[0] - pos2[0]
+    dy = pos1[1] - pos2[1]
+    return dx * dx + dy * dy
+
+
+def _generate_node_positions(n_nodes: int, seed: int = None) -> np.ndarray:
     """
     Generate 2D spatial positions for all nodes.
     
@@ -63,39 +79,52 @@ def _generate_node_positions(n_nodes: int, seed: int = None) -> List[Tuple[float
         seed: Random seed for reproducibility
     
     Returns:
-        List of (x, y) coordinate tuples
+        Contiguous (N, 2) float64 array of (x, y) coordinates
     """
-    rng = random.Random(seed)
+    rng = np.random.default_rng(seed)
     positions = []
-    
+
     # Fixed positions for depot and key intersections
     positions.append((10.0, 50.0))   # Node 0: Depot
     positions.append((25.0, 50.0))   # Node 1: Intersection-1
     positions.append((25.0, 35.0))   # Node 2: Intersection-2
-    
-    # Random positions for remaining nodes
+
+    # Random positions for remaining nodes, peeled off bulk batches
+    # instead of two Python-level uniform() calls per attempt
     # Avoid clustering too close to depot/intersections
+    batch = max(8 * n_nodes, 64)
+    xs = rng.uniform(15, 95, size=batch)
+    ys = rng.uniform(10, 90, size=batch)
+    cursor = 0
+
     for i in range(3, n_nodes):
         # Generate position with minimum distance from existing nodes
-        attempts = 0
-        while attempts < 50:
-            x = rng.uniform(15, 95)
-            y = rng.uniform(10, 90)
-            
+        for _ in range(50):
+            if cursor >= batch:
+                xs = rng.uniform(15, 95, size=batch)
+                ys = rng.uniform(10, 90, size=batch)
+                cursor = 0
+            x = float(xs[cursor])
+            y = float(ys[cursor])
+            cursor += 1
+
             # Check minimum distance from depot and first intersections
-            if _euclidean_distance((x, y), positions[0]) > 15:
+            if _squared_distance((x, y), positions[0]) > 225:  # 15 km
                 positions.append((x, y))
                 break
-            attempts += 1
         else:
             # Fallback: just place it randomly
-            positions.append((rng.uniform(20, 90), rng.uniform(10, 90)))
-    
-    return positions
+            positions.append(
+                (float(rng.uniform(20, 90)), float(rng.uniform(10, 90)))
+            )
+
+    # One contiguous (N, 2) array instead of a list of heap tuples — every
+    # downstream helper indexes or vectorizes over it directly
+    return np.array(positions, dtype=np.float64)
 
 
 def _assign_node_roles(
-    positions: List[Tuple[float, float]], 
+    positions: np.ndarray,
     num_customers: int, 
     num_bss: int,
     seed: Optional[int] = None
@@ -111,7 +140,7 @@ def _assign_node_roles(
     - Remaining: Intersections
     
     Args:
-        positions: List of (x, y) coordinates
+        positions: (N, 2) coordinate array
         num_customers: Number of customer nodes
         num_bss: Number of BSS stations
         seed: Optional random seed for deterministic assignment
@@ -127,99 +156,91 @@ def _assign_node_roles(
     roles[0] = 'depot'
     roles[1] = 'intersection'
     roles[2] = 'intersection'
-    
-    # Available nodes for role assignment (excluding 0, 1, 2)
-    available_nodes = list(range(3, n_nodes))
-    
+
+    # Availability mask instead of a list with O(N) removals
+    available = np.ones(n_nodes, dtype=bool)
+    available[:3] = False
+
     # Assign customers using quadrant quotas
     customer_nodes = _assign_customers_quadrant_quota(
-        positions, available_nodes, num_customers, rng
+        positions, available, num_customers, rng
     )
     for idx in customer_nodes:
         roles[idx] = 'customer'
-        if idx in available_nodes:
-            available_nodes.remove(idx)
-    
+        available[idx] = False
+
     # Assign BSS using K-Means clustering
     bss_nodes = _assign_bss_kmeans(
-        positions, available_nodes, num_bss, rng
+        positions, np.flatnonzero(available).tolist(), num_bss, rng
     )
     for idx in bss_nodes:
         roles[idx] = 'bss'
-        if idx in available_nodes:
-            available_nodes.remove(idx)
-    
+        available[idx] = False
+
     # Remaining nodes are intersections
-    for idx in available_nodes:
-        roles[idx] = 'intersection'
-    
+    for idx in np.flatnonzero(available):
+        roles[int(idx)] = 'intersection'
+
     return roles
 
 
 def _assign_customers_quadrant_quota(
-    positions: List[Tuple[float, float]],
-    candidate_nodes: List[int],
+    positions: np.ndarray,
+    available: np.ndarray,
     num_customers: int,
     rng: random.Random
 ) -> List[int]:
     """
     Assign customers by ensuring spatial coverage via quadrant quotas.
+
+    `available` is a boolean mask over all nodes; selections here do not
+    modify it (the caller clears the chosen indices).
     """
-    if num_customers <= 0 or not candidate_nodes:
+    if num_customers <= 0 or not available.any():
         return []
-    
-    # Compute bounding box for candidate nodes
-    xs = [positions[idx][0] for idx in candidate_nodes]
-    ys = [positions[idx][1] for idx in candidate_nodes]
-    min_x, max_x = min(xs), max(xs)
-    min_y, max_y = min(ys), max(ys)
-    mid_x = 0.5 * (min_x + max_x)
-    mid_y = 0.5 * (min_y + max_y)
-    
-    quadrants = {
-        "q1": [],
-        "q2": [],
-        "q3": [],
-        "q4": []
-    }
-    
-    for idx in candidate_nodes:
-        x, y = positions[idx]
-        if x <= mid_x and y >= mid_y:
-            quadrants["q1"].append(idx)
-        elif x > mid_x and y >= mid_y:
-            quadrants["q2"].append(idx)
-        elif x <= mid_x and y < mid_y:
-            quadrants["q3"].append(idx)
-        else:
-            quadrants["q4"].append(idx)
-    
+
+    x = positions[:, 0]
+    y = positions[:, 1]
+
+    # Bounding box over the candidate nodes only
+    cand_x = x[available]
+    cand_y = y[available]
+    mid_x = 0.5 * (cand_x.min() + cand_x.max())
+    mid_y = 0.5 * (cand_y.min() + cand_y.max())
+
+    quadrant_masks = (
+        available & (x <= mid_x) & (y >= mid_y),   # q1
+        available & (x > mid_x) & (y >= mid_y),    # q2
+        available & (x <= mid_x) & (y < mid_y),    # q3
+        available & (x > mid_x) & (y < mid_y),     # q4
+    )
+
     selected: List[int] = []
-    taken = set()
-    
+    taken = np.zeros(len(positions), dtype=bool)
+
     # Coverage pass: ensure at most one per quadrant
-    for quadrant_name in ("q1", "q2", "q3", "q4"):
+    for quadrant_mask in quadrant_masks:
         if len(selected) >= num_customers:
             break
-        candidates = [idx for idx in quadrants[quadrant_name] if idx not in taken]
+        candidates = np.flatnonzero(quadrant_mask & ~taken).tolist()
         if candidates:
             chosen = rng.choice(candidates)
             selected.append(chosen)
-            taken.add(chosen)
-    
+            taken[chosen] = True
+
     # Fill remaining slots from the pooled candidates
     if len(selected) < num_customers:
-        remaining_candidates = [idx for idx in candidate_nodes if idx not in taken]
+        remaining_candidates = np.flatnonzero(available & ~taken).tolist()
         if remaining_candidates:
             rng.shuffle(remaining_candidates)
             needed = num_customers - len(selected)
             selected.extend(remaining_candidates[:needed])
-    
+
     return selected
 
 
 def _assign_bss_kmeans(
-    positions: List[Tuple[float, float]],
+    positions: np.ndarray,
     candidate_nodes: List[int],
     num_bss: int,
     rng: random.Random
@@ -242,27 +263,35 @@ def _assign_bss_kmeans(
         rng.shuffle(unique_candidates)
         return unique_candidates[:num_bss]
     
-    coords = np.array([positions[idx] for idx in unique_candidates], dtype=float)
-    kmeans = KMeans(n_clusters=num_bss, random_state=42, n_init=10)
+    coords = positions[unique_candidates]
+    # A single k-means++ initialized run is plenty for these tiny inputs;
+    # n_init=10 spent 10x the fit work on setup-dominated problems
+    kmeans = KMeans(
+        n_clusters=num_bss,
+        random_state=42,
+        n_init=1,
+        init='k-means++',
+        algorithm='lloyd',
+        max_iter=50,
+    )
     kmeans.fit(coords)
     
     assigned: List[int] = []
     assigned_set = set()
     
     for cluster_idx in range(num_bss):
-        indices = [
-            i for i, label in enumerate(kmeans.labels_) if label == cluster_idx
-        ]
-        if not indices:
+        members = np.flatnonzero(kmeans.labels_ == cluster_idx)
+        if members.size == 0:
             continue
-        
-        centroid = tuple(kmeans.cluster_centers_[cluster_idx])
-        indices.sort(
-            key=lambda i: _euclidean_distance(positions[unique_candidates[i]], centroid)
-        )
-        
-        for candidate_idx in indices:
-            node_id = unique_candidates[candidate_idx]
+
+        # Rank the whole cluster against its centroid in one vectorized
+        # pass; squared distances keep the same order without the sqrt,
+        # and the stable argsort keeps the old index tie-breaking
+        d2 = ((coords[members] - kmeans.cluster_centers_[cluster_idx]) ** 2).sum(axis=1)
+        members = members[np.argsort(d2, kind="stable")]
+
+        for candidate_idx in members:
+            node_id = unique_candidates[int(candidate_idx)]
             if node_id in assigned_set:
                 continue
             assigned.append(node_id)
@@ -280,369 +309,456 @@ def _assign_bss_kmeans(
     return assigned[:num_bss]
 
 
-def _check_edge_intersection(
-    p1: Tuple[float, float], 
-    p2: Tuple[float, float],
-    p3: Tuple[float, float], 
-    p4: Tuple[float, float]
-) -> bool:
+def _overlap_kernel(ax, ay, bx, by, segs, nseg):
     """
-    Check if line segment p1-p2 intersects with line segment p3-p4.
-    
-    Uses cross-product method to detect intersection.
-    
-    Returns:
-        True if segments intersect (excluding endpoints)
+    Count crossings of segment (a, b) against the first nseg rows of the
+    (E, 4) segment buffer. Returns True once more than two overlaps are
+    found. Scalar float compute over a contiguous array, so Numba can
+    compile it when available.
+
+    Segments strictly cross when the endpoints of each lie on opposite
+    sides of the other, i.e. both orientation sign-products are
+    negative — two multiplies per test instead of four boolean
+    comparisons XORed together.
     """
-    def ccw(A, B, C):
-        return (C[1] - A[1]) * (B[0] - A[0]) > (B[1] - A[1]) * (C[0] - A[0])
-    
-    # Check if segments share an endpoint
-    if p1 == p3 or p1 == p4 or p2 == p3 or p2 == p4:
-        return False
-    
-    return ccw(p1, p3, p4) != ccw(p2, p3, p4) and ccw(p1, p2, p3) != ccw(p1, p2, p4)
+    overlap_count = 0
+    bax = bx - ax
+    bay = by - ay
+    for k in range(nseg):
+        cx = segs[k, 0]
+        cy = segs[k, 1]
+        dx = segs[k, 2]
+        dy = segs[k, 3]
+        # Segments sharing an endpoint never count as overlapping
+        if ((ax == cx and ay == cy) or (ax == dx and ay == dy)
+                or (bx == cx and by == cy) or (bx == dx and by == dy)):
+            continue
+        dcx = dx - cx
+        dcy = dy - cy
+        d1 = dcx * (ay - cy) - dcy * (ax - cx)
+        d2 = dcx * (by - cy) - dcy * (bx - cx)
+        d3 = bax * (cy - ay) - bay * (cx - ax)
+        d4 = bax * (dy - ay) - bay * (dx - ax)
+        if d1 * d2 < 0 and d3 * d4 < 0:
+            overlap_count += 1
+            if overlap_count > 2:  # Allow some overlaps
+                return True
+    return False
+
+
+if njit is not None:
+    # No cache=True: this module is imported both as a package module and
+    # as a script, and a kernel cached under one identity fails to load
+    # under the other
+    _overlap_kernel = njit(fastmath=True)(_overlap_kernel)
 
 
 def _would_overlap(
-    node_a: int, 
-    node_b: int, 
-    edges: Dict[int, List[int]], 
-    positions: List[Tuple[float, float]]
+    node_a: int,
+    node_b: int,
+    pos: np.ndarray,
+    seg_buf: np.ndarray,
+    seg_count: int
 ) -> bool:
     """
     Check if adding edge (node_a, node_b) would create overlaps with existing edges.
-    
+
     Args:
         node_a: First node
         node_b: Second node
-        edges: Current edge dictionary
-        positions: Node positions
-    
+        pos: (N, 2) float64 position array
+        seg_buf: (E, 4) buffer of existing segments as (x1, y1, x2, y2)
+        seg_count: Number of valid rows in seg_buf
+
     Returns:
         True if edge would overlap with existing edges
     """
-    new_edge = (positions[node_a], positions[node_b])
-    overlap_count = 0
-    
-    for node_i, neighbors in edges.items():
-        for node_j in neighbors:
-            if node_i < node_j:  # Check each edge once
-                existing_edge = (positions[node_i], positions[node_j])
-                if _check_edge_intersection(new_edge[0], new_edge[1], 
-                                           existing_edge[0], existing_edge[1]):
-                    overlap_count += 1
-                    if overlap_count > 2:  # Allow some overlaps
-                        return True
-    
-    return False
+    return _overlap_kernel(
+        pos[node_a, 0], pos[node_a, 1],
+        pos[node_b, 0], pos[node_b, 1],
+        seg_buf, seg_count,
+    )
+
+
+def _compute_squared_distance_matrix(positions: np.ndarray) -> np.ndarray:
+    """
+    Pairwise squared Euclidean distance matrix, computed once per network.
+    Every consumer only ranks or min/max-compares distances, so the sqrt
+    is skipped entirely.
+    """
+    return ((positions[:, None, :] - positions[None, :, :]) ** 2).sum(-1)
+
+
+# Adjacency rows hold the default max degree (5) plus generous slack for
+# edges added later by connectivity repair; unused slots stay -1
+_ADJ_WIDTH = 16
+
+
+def _new_adjacency(n_nodes: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Allocate the (N, width) neighbor table and per-node degree vector."""
+    adj = np.full((n_nodes, _ADJ_WIDTH), -1, dtype=np.int32)
+    degree = np.zeros(n_nodes, dtype=np.int32)
+    return adj, degree
+
+
+def _has_edge(adj: np.ndarray, degree: np.ndarray, i: int, j: int) -> bool:
+    """True if j already appears among i's neighbors."""
+    return bool((adj[i, :degree[i]] == j).any())
+
+
+def _add_edge(adj: np.ndarray, degree: np.ndarray, i: int, j: int) -> None:
+    """Add the undirected edge (i, j) to the neighbor table."""
+    adj[i, degree[i]] = j
+    degree[i] += 1
+    adj[j, degree[j]] = i
+    degree[j] += 1
+
+
+def _remove_edge(adj: np.ndarray, degree: np.ndarray, i: int, j: int) -> None:
+    """Drop the undirected edge (i, j); row order is not preserved."""
+    for a, b in ((i, j), (j, i)):
+        row = adj[a, :degree[a]]
+        pos = int(np.flatnonzero(row == b)[0])
+        row[pos] = row[degree[a] - 1]
+        adj[a, degree[a] - 1] = -1
+        degree[a] -= 1
 
 
 def _generate_edges_proximity(
-    positions: List[Tuple[float, float]], 
+    positions: np.ndarray,
     roles: Dict[int, str],
     seed: int = None,
     min_degree: int = 2,
-    max_degree: int = 5
-) -> Dict[int, List[int]]:
+    max_degree: int = 5,
+    dist_sq: Optional[np.ndarray] = None,
+    adj: Optional[np.ndarray] = None,
+    degree: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
     """
     Generate edges using proximity-based approach.
-    
+
     Fixed constraint: Depot (0) connects only to nodes 1 and 2
-    
+
     Args:
         positions: Node positions
         roles: Node role assignments
         seed: Random seed
         min_degree: Minimum edges per node
         max_degree: Maximum edges per node
-    
+        dist_sq: Optional shared squared-distance matrix
+        adj: Optional preallocated neighbor table to fill
+        degree: Optional preallocated degree vector to fill
+
     Returns:
-        Dictionary mapping node to list of connected neighbors
+        Tuple of (neighbor table, degree vector)
     """
     rng = random.Random(seed)
     n_nodes = len(positions)
-    edges = {i: [] for i in range(n_nodes)}
-    
+    if adj is None or degree is None:
+        adj, degree = _new_adjacency(n_nodes)
+
     # HARD CONSTRAINT: Depot edges (always 1 and 2 only)
-    edges[0] = [1, 2]
-    edges[1] = [0, 2]
-    edges[2] = [0, 1]
-    
-    # Generate proximity-based edges for all other nodes
+    _add_edge(adj, degree, 0, 1)
+    _add_edge(adj, degree, 0, 2)
+    _add_edge(adj, degree, 1, 2)
+
+    # Distance matrix is shared across the pipeline; compute only if the
+    # caller did not supply one
+    dist_matrix = dist_sq if dist_sq is not None else _compute_squared_distance_matrix(positions)
+
+    # Segment buffer for the overlap predicate: each undirected edge is
+    # stored once as (x1, y1, x2, y2), seeded with the fixed depot triangle
+    seg_buf = np.empty((3 + n_nodes * max_degree, 4), dtype=np.float64)
+    for k, (a, b) in enumerate(((0, 1), (0, 2), (1, 2))):
+        seg_buf[k, 0:2] = positions[a]
+        seg_buf[k, 2:4] = positions[b]
+    seg_count = 3
+
+    # Phase 1: rank every node's candidates in one batched argsort (the
+    # rows are independent, so NumPy can process them without the
+    # per-node Python round-trip). The stable sort keeps the old
+    # (distance, index) tie-breaking of the tuple sort.
+    orders = np.argsort(dist_matrix, axis=1, kind="stable")
+
+    # Phase 2: apply degree/overlap constraints serially — edge adds are
+    # stateful, so only this pass has to stay sequential
     for node_i in range(3, n_nodes):
-        # Calculate distances to all other nodes
-        distances = []
-        for node_j in range(n_nodes):
-            if node_j == node_i:
-                continue
-            dist = _euclidean_distance(positions[node_i], positions[node_j])
-            distances.append((dist, node_j))
-        
-        distances.sort()  # Nearest first
-        
+        order = orders[node_i]
+
         # Try to connect to k nearest neighbors
         target_degree = rng.randint(min_degree, max_degree)
-        current_degree = len(edges[node_i])
-        
-        for dist, node_j in distances:
+        current_degree = int(degree[node_i])
+
+        for node_j in order:
+            node_j = int(node_j)
+            if node_j == node_i:
+                continue
             if current_degree >= target_degree:
                 break
-            
+
             # Check if this edge already exists
-            if node_j in edges[node_i]:
+            if _has_edge(adj, degree, node_i, node_j):
                 continue
-            
+
             # Check degree constraints
-            if len(edges[node_j]) >= max_degree:
+            if degree[node_j] >= max_degree:
                 continue
-            
+
             # Special constraint: depot can't have more edges
             if node_j == 0:
                 continue
-            
+
             # Check for excessive overlaps
-            if not _would_overlap(node_i, node_j, edges, positions):
+            if not _would_overlap(node_i, node_j, positions, seg_buf, seg_count):
                 # Add bidirectional edge
-                edges[node_i].append(node_j)
-                edges[node_j].append(node_i)
+                _add_edge(adj, degree, node_i, node_j)
+                seg_buf[seg_count, 0:2] = positions[node_i]
+                seg_buf[seg_count, 2:4] = positions[node_j]
+                seg_count += 1
                 current_degree += 1
-    
-    return edges
 
+    return adj, degree
 
-def _check_connectivity(edges: Dict[int, List[int]], n_nodes: int) -> bool:
+
+def _connected_component_labels(
+    adj: np.ndarray,
+    degree: np.ndarray,
+    n_nodes: int
+) -> Tuple[int, List[int]]:
     """
-    Check if all nodes are reachable from depot using BFS.
-    
+    Label the connected component of every node.
+
+    Uses scipy's C-level connected_components on a CSR adjacency when
+    scipy is installed, falling back to Python BFS otherwise.
+
+    Returns:
+        Tuple of (component count, per-node component label list)
+    """
+    if csr_matrix is not None:
+        valid = np.arange(adj.shape[1])[None, :] < degree[:, None]
+        rows = np.repeat(np.arange(n_nodes), degree)
+        cols = adj[valid]
+        adjacency = csr_matrix(
+            (np.ones(len(rows), dtype=np.int8), (rows, cols)),
+            shape=(n_nodes, n_nodes),
+        )
+        n_comp, labels = connected_components(adjacency, directed=False)
+        return int(n_comp), labels.tolist()
+
+    labels = [-1] * n_nodes
+    n_comp = 0
+    for start_node in range(n_nodes):
+        if labels[start_node] != -1:
+            continue
+        labels[start_node] = n_comp
+        queue = deque([start_node])
+        while queue:
+            node = queue.popleft()
+            for neighbor in adj[node, :degree[node]]:
+                neighbor = int(neighbor)
+                if labels[neighbor] == -1:
+                    labels[neighbor] = n_comp
+                    queue.append(neighbor)
+        n_comp += 1
+    return n_comp, labels
+
+
+def _check_connectivity(adj: np.ndarray, degree: np.ndarray, n_nodes: int) -> bool:
+    """
+    Check if all nodes belong to a single connected component.
+
     Args:
-        edges: Edge dictionary
+        adj: Neighbor table
+        degree: Degree vector
         n_nodes: Total number of nodes
-    
+
     Returns:
         True if graph is fully connected
     """
-    visited = set()
-    queue = deque([0])  # Start from depot
-    visited.add(0)
-    
-    while queue:
-        node = queue.popleft()
-        for neighbor in edges[node]:
-            if neighbor not in visited:
-                visited.add(neighbor)
-                queue.append(neighbor)
-    
-    return len(visited) == n_nodes
+    n_comp, _ = _connected_component_labels(adj, degree, n_nodes)
+    return n_comp == 1
 
 
 def _fix_disconnected_components(
-    edges: Dict[int, List[int]], 
-    positions: List[Tuple[float, float]]
-) -> Dict[int, List[int]]:
+    adj: np.ndarray,
+    degree: np.ndarray,
+    positions: np.ndarray,
+    dist_sq: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
     """
     Add minimum edges to connect disconnected components.
-    
+
     Args:
-        edges: Current edge dictionary
+        adj: Neighbor table
+        degree: Degree vector
         positions: Node positions
-    
+
     Returns:
-        Updated edge dictionary with full connectivity
+        Tuple of (neighbor table, degree vector) with full connectivity
     """
     n_nodes = len(positions)
-    
-    # Find all components using BFS
-    visited = set()
-    components = []
-    
-    for start_node in range(n_nodes):
-        if start_node in visited:
-            continue
-        
-        component = set()
-        queue = deque([start_node])
-        component.add(start_node)
-        visited.add(start_node)
-        
-        while queue:
-            node = queue.popleft()
-            for neighbor in edges[node]:
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    component.add(neighbor)
-                    queue.append(neighbor)
-        
-        components.append(component)
-    
-    # Connect components by finding nearest pairs
-    while len(components) > 1:
-        # Find closest pair of nodes from different components
-        min_dist = float('inf')
-        best_pair = None
-        comp_indices = None
-        
-        for i, comp_i in enumerate(components):
-            for j, comp_j in enumerate(components[i+1:], start=i+1):
-                for node_a in comp_i:
-                    for node_b in comp_j:
-                        # Skip depot (it already has fixed connections)
-                        if node_a == 0 or node_b == 0:
-                            continue
-                        
-                        dist = _euclidean_distance(positions[node_a], positions[node_b])
-                        if dist < min_dist:
-                            min_dist = dist
-                            best_pair = (node_a, node_b)
-                            comp_indices = (i, j)
-        
-        if best_pair:
-            # Add edge between components
-            node_a, node_b = best_pair
-            edges[node_a].append(node_b)
-            edges[node_b].append(node_a)
-            
-            # Merge components
-            i, j = comp_indices
-            components[i].update(components[j])
-            components.pop(j)
-        else:
+    if dist_sq is None:
+        dist_sq = _compute_squared_distance_matrix(positions)
+
+    # Label components, then repeatedly link the globally nearest
+    # cross-component pair: intra-component (and depot) distances are
+    # masked to +inf so each merge is a single vectorized argmin over
+    # the shared squared-distance matrix
+    n_comp, labels = _connected_component_labels(adj, degree, n_nodes)
+    if n_comp <= 1:
+        return adj, degree
+
+    labels_arr = np.asarray(labels)
+    masked = dist_sq.copy()
+    # Depot already has its fixed connections
+    masked[0, :] = np.inf
+    masked[:, 0] = np.inf
+
+    for _ in range(n_comp - 1):
+        cross = np.where(labels_arr[:, None] == labels_arr[None, :], np.inf, masked)
+        flat = int(np.argmin(cross))
+        node_a, node_b = np.unravel_index(flat, cross.shape)
+        if not np.isfinite(cross[node_a, node_b]):
             break
-    
-    return edges
+
+        # Add edge between components and relabel the absorbed one
+        _add_edge(adj, degree, int(node_a), int(node_b))
+        labels_arr[labels_arr == labels_arr[node_b]] = labels_arr[node_a]
+
+    return adj, degree
 
 
 def _validate_node_degrees(
-    edges: Dict[int, List[int]], 
-    positions: List[Tuple[float, float]],
+    adj: np.ndarray,
+    degree: np.ndarray,
+    positions: np.ndarray,
     min_degree: int = 2,
-    max_degree: int = 5
-) -> Dict[int, List[int]]:
+    max_degree: int = 5,
+    dist_sq: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
     """
     Ensure all nodes have appropriate number of edges.
-    
+
     Args:
-        edges: Edge dictionary
+        adj: Neighbor table
+        degree: Degree vector
         positions: Node positions
         min_degree: Minimum edges per node
         max_degree: Maximum edges per node
-    
+
     Returns:
-        Updated edge dictionary with valid degrees
+        Tuple of (neighbor table, degree vector) with valid degrees
     """
     n_nodes = len(positions)
-    
+    if dist_sq is None:
+        dist_sq = _compute_squared_distance_matrix(positions)
+
     # Fix nodes with too few edges
     for node_i in range(n_nodes):
-        while len(edges[node_i]) < min_degree:
+        while degree[node_i] < min_degree:
             # Skip depot (it has exactly 2 edges)
             if node_i == 0:
                 break
-            
+
             # Find nearest unconnected node
             min_dist = float('inf')
             best_node = None
-            
+
             for node_j in range(n_nodes):
-                if node_j == node_i or node_j in edges[node_i]:
+                if node_j == node_i or _has_edge(adj, degree, node_i, node_j):
                     continue
                 if node_j == 0:  # Can't connect to depot
                     continue
-                if len(edges[node_j]) >= max_degree:
+                if degree[node_j] >= max_degree:
                     continue
-                
-                dist = _euclidean_distance(positions[node_i], positions[node_j])
-                if dist < min_dist:
-                    min_dist = dist
+
+                d = dist_sq[node_i, node_j]
+                if d < min_dist:
+                    min_dist = d
                     best_node = node_j
-            
+
             if best_node is not None:
-                edges[node_i].append(best_node)
-                edges[node_j].append(node_i)
+                _add_edge(adj, degree, node_i, best_node)
             else:
                 break
-    
+
     # Fix nodes with too many edges (trim longest edges)
     for node_i in range(n_nodes):
         if node_i == 0:  # Don't modify depot
             continue
-        
-        while len(edges[node_i]) > max_degree:
+
+        while degree[node_i] > max_degree:
             # Find longest edge
             max_dist = -1
             farthest_node = None
-            
-            for node_j in edges[node_i]:
+
+            for node_j in adj[node_i, :degree[node_i]].tolist():
                 # Don't remove depot connections for nodes 1 and 2
                 if node_i in [1, 2] and node_j == 0:
                     continue
-                
-                dist = _euclidean_distance(positions[node_i], positions[node_j])
-                if dist > max_dist:
-                    max_dist = dist
+
+                d = dist_sq[node_i, node_j]
+                if d > max_dist:
+                    max_dist = d
                     farthest_node = node_j
-            
+
             if farthest_node is not None:
-                edges[node_i].remove(farthest_node)
-                edges[farthest_node].remove(node_i)
+                _remove_edge(adj, degree, node_i, farthest_node)
             else:
                 break
-    
-    return edges
+
+    return adj, degree
 
 
 def _format_output(
-    edges: Dict[int, List[int]], 
-    roles: Dict[int, str], 
+    adj: np.ndarray,
+    degree: np.ndarray,
+    roles: Dict[int, str],
     n_nodes: int
 ) -> Tuple[List[List[int]], Dict[int, str], Dict[str, str]]:
     """
     Convert internal representation to required output format.
-    
+
     Args:
-        edges: Edge dictionary
+        adj: Neighbor table
+        degree: Degree vector
         roles: Node role assignments
         n_nodes: Total number of nodes
-    
+
     Returns:
         Tuple of (table, idx2label, node_types)
     """
-    # Create table (adjacency list)
+    # Create table (adjacency list): sort each row in place on the NumPy
+    # buffer, then materialize Python lists once
     table = []
     for i in range(n_nodes):
-        neighbors = sorted(edges[i])
-        table.append(neighbors)
-    
-    # Create idx2label mapping
-    idx2label = {}
-    
-    # Depot
-    idx2label[0] = "D"
-    
-    # Intersections (nodes 1, 2, and others)
-    intersection_count = 1
-    customer_count = 1
-    bss_count = 1
-    
+        row = adj[i, :degree[i]]
+        row.sort()
+        table.append(row.tolist())
+
+    # Create idx2label mapping: per-role cumulative counts replace the
+    # three sequential counters (labels are numbered 1.. within each role
+    # in index order, exactly as before)
+    roles_arr = np.array([roles[i] for i in range(n_nodes)])
+    is_intersection = roles_arr == 'intersection'
+    is_customer = roles_arr == 'customer'
+    is_bss = roles_arr == 'bss'
+    intersection_ids = np.cumsum(is_intersection)
+    customer_ids = np.cumsum(is_customer)
+    bss_ids = np.cumsum(is_bss)
+
+    idx2label = {0: "D"}
     for i in range(1, n_nodes):
-        role = roles[i]
-        
-        if role == 'intersection':
-            idx2label[i] = str(intersection_count)
-            intersection_count += 1
-        elif role == 'customer':
-            idx2label[i] = f"C{customer_count}"
-            customer_count += 1
-        elif role == 'bss':
-            idx2label[i] = f"BSS{bss_count}"
-            bss_count += 1
-    
+        if is_intersection[i]:
+            idx2label[i] = str(intersection_ids[i])
+        elif is_customer[i]:
+            idx2label[i] = f"C{customer_ids[i]}"
+        elif is_bss[i]:
+            idx2label[i] = f"BSS{bss_ids[i]}"
+
     # Create node_types mapping
-    node_types = {}
-    for i in range(n_nodes):
-        label = idx2label[i]
-        node_types[label] = roles[i]
-    
+    node_types = {idx2label[i]: roles[i] for i in range(n_nodes)}
+
     return table, idx2label, node_types
 
 
@@ -700,71 +816,82 @@ def generate_network(
     print("Step 1: Generating node positions...")
     positions = _generate_node_positions(total_nodes, seed)
     
+    # Pairwise distances are reused by edge generation, connectivity
+    # repair, and degree validation — compute them once here
+    dist_sq = _compute_squared_distance_matrix(positions)
+
     # Step 2: Assign roles
     print("Step 2: Assigning node roles...")
     roles = _assign_node_roles(positions, num_customers, num_bss, seed=seed)
-    
+
     # Step 3: Generate edges with depot constraint
     print("Step 3: Generating edges...")
-    edges = _generate_edges_proximity(positions, roles, seed)
-    
+    adj, degree = _new_adjacency(total_nodes)
+    _generate_edges_proximity(
+        positions, roles, seed, dist_sq=dist_sq, adj=adj, degree=degree
+    )
+
     # Step 4: Ensure connectivity
     print("Step 4: Checking connectivity...")
-    if not _check_connectivity(edges, total_nodes):
+    if not _check_connectivity(adj, degree, total_nodes):
         print("  - Graph disconnected, fixing...")
-        edges = _fix_disconnected_components(edges, positions)
-    
+        _fix_disconnected_components(adj, degree, positions, dist_sq=dist_sq)
+
     # Step 5: Validate degrees
     print("Step 5: Validating node degrees...")
-    edges = _validate_node_degrees(edges, positions)
-    
+    _validate_node_degrees(adj, degree, positions, dist_sq=dist_sq)
+
     # Step 6: Format output
     print("Step 6: Formatting output...")
-    table, idx2label, node_types = _format_output(edges, roles, total_nodes)
-    
+    table, idx2label, node_types = _format_output(adj, degree, roles, total_nodes)
+
     print("Network generation complete!")
     print(f"  - Depot has {len(table[0])} edges (should be 2): {table[0]}")
-    print(f"  - All nodes connected: {_check_connectivity(edges, total_nodes)}")
+    print(f"  - All nodes connected: {_check_connectivity(adj, degree, total_nodes)}")
     
     # Save to file if requested
     if save_to_file:
         output_filename = get_next_output_filename()
         print(f"\nStep 7: Saving to file...")
         
+        # Accumulate everything and hand the write path a single string
+        parts = [
+            "="*70 + "\n",
+            "NETWORK CONFIGURATION\n",
+            "="*70 + "\n\n",
+            f"Total Nodes: {total_nodes}\n",
+            f"Customers: {num_customers}\n",
+            f"BSS Stations: {num_bss}\n",
+            f"Intersections: {total_nodes - num_customers - num_bss - 1}\n",
+            "Depot: 1\n",
+        ]
+        if seed is not None:
+            parts.append(f"Seed: {seed}\n")
+        parts.append("\n" + "="*70 + "\n\n")
+
+        # Write table
+        parts.append("table = [\n")
+        for i, neighbors in enumerate(table):
+            label = idx2label[i]
+            node_type = node_types[label]
+            parts.append(f"    {neighbors},  # Node {i}: {label} ({node_type})\n")
+        parts.append("]\n\n")
+
+        # Write idx2label
+        parts.append("idx2label = {\n")
+        for idx, label in sorted(idx2label.items()):
+            parts.append(f"    {idx}: \"{label}\",\n")
+        parts.append("}\n\n")
+
+        # Write node_types
+        parts.append("node_types = {\n")
+        for label, ntype in sorted(node_types.items(), key=lambda kv: (kv[1], kv[0])):
+            parts.append(f"    \"{label}\": \"{ntype}\",\n")
+        parts.append("}\n")
+
         with open(output_filename, 'w', encoding='utf-8') as f:
-            f.write("="*70 + "\n")
-            f.write("NETWORK CONFIGURATION\n")
-            f.write("="*70 + "\n\n")
-            
-            f.write(f"Total Nodes: {total_nodes}\n")
-            f.write(f"Customers: {num_customers}\n")
-            f.write(f"BSS Stations: {num_bss}\n")
-            f.write(f"Intersections: {total_nodes - num_customers - num_bss - 1}\n")
-            f.write(f"Depot: 1\n")
-            if seed is not None:
-                f.write(f"Seed: {seed}\n")
-            f.write("\n" + "="*70 + "\n\n")
-            
-            # Write table
-            f.write("table = [\n")
-            for i, neighbors in enumerate(table):
-                label = idx2label[i]
-                node_type = node_types[label]
-                f.write(f"    {neighbors},  # Node {i}: {label} ({node_type})\n")
-            f.write("]\n\n")
-            
-            # Write idx2label
-            f.write("idx2label = {\n")
-            for idx in sorted(idx2label.keys()):
-                f.write(f"    {idx}: \"{idx2label[idx]}\",\n")
-            f.write("}\n\n")
-            
-            # Write node_types
-            f.write("node_types = {\n")
-            for label in sorted(node_types.keys(), key=lambda x: (node_types[x], x)):
-                f.write(f"    \"{label}\": \"{node_types[label]}\",\n")
-            f.write("}\n")
-        
+            f.write("".join(parts))
+
         print(f"Saved to: {output_filename}")
     
     return table, idx2label, node_types
@@ -1,3 +1,5 @@
+import numpy as np
+
 idx2label = {
     0: "D",
     1: "1",
@@ -29,14 +31,12 @@ idx2label = {
 
 def build_indicator_vectors(idx2label: dict):
     n = len(idx2label)
-    customer_list = [0] * n
-    bss_list = [0] * n
-
-    for idx, label in idx2label.items():
-        if label.startswith("BSS"):
-            bss_list[idx] = 1
-        if label.startswith("C"):
-            customer_list[idx] = 1
+    labels = np.array([idx2label[i] for i in range(n)])
+
+    # Vectorized prefix tests; "C" never prefixes a BSS label so the two
+    # masks are disjoint by construction
+    bss_list = np.char.startswith(labels, "BSS").astype(np.int8).tolist()
+    customer_list = np.char.startswith(labels, "C").astype(np.int8).tolist()
 
     # add one extra 0 at the end
     customer_list.append(0)
@@ -3,8 +3,8 @@ Export first DataFrame-like output (text/plain) + first inline PNG plot per `##
 inside each top-level markdown `# Title` section of Jupyter notebooks.
 
 Constraints:
-- Parses notebooks with nbformat WITHOUT executing.
-- Uses only standard library + nbformat + pandas.
+- Parses notebook JSON WITHOUT executing (streamed via ijson when available).
+- Uses only standard library + pandas (+ optional ijson).
 - Robust to missing outputs / malformed notebooks; skips missing pairs and continues.
 
 Output layout:
@@ -19,18 +19,20 @@ If <directory> is omitted, defaults to the script's directory (viz/).
 from __future__ import annotations
 
 import argparse
-import base64
+import functools
 import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from io import StringIO
 from pathlib import Path
 from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-import nbformat
+import numpy as np
 import pandas as pd
 
+from notebook_sections import first_source_line, iter_cells, write_png_b64
+
 
 WINDOWS_RESERVED_NAMES = {
     "CON",
@@ -41,6 +43,18 @@ WINDOWS_RESERVED_NAMES = {
     *(f"LPT{i}" for i in range(1, 10)),
 }
 
+# Compiled once at import: these run on every heading/output of every
+# notebook, so per-call re-cache lookups add up
+# Single-char illegal/control substitutions run through one C-level
+# translate table; only the catch-all unsafe-run and collapsing passes
+# still need a regex
+_SLUG_TRANS = str.maketrans(
+    {c: "_" for c in '<>:"/\\|?*' + "".join(map(chr, range(32)))}
+)
+_NONSAFE_RE = re.compile(r"[^A-Za-z0-9 .,_\-()]+")
+_WS_OR_USCORE_RE = re.compile(r"[\s_]+")
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*)$")
+
 
 def slugify(name: str, *, max_len: int = 120) -> str:
     """
@@ -54,14 +68,11 @@ def slugify(name: str, *, max_len: int = 120) -> str:
     if not s:
         s = "untitled"
 
-    # Replace path separators and other illegal chars with underscore
-    s = re.sub(r"[<>:\"/\\\\|?*\x00-\x1F]", "_", s)
-    # Collapse whitespace
-    s = re.sub(r"\s+", " ", s).strip()
-    # Replace remaining non-safe chars with underscore
-    s = re.sub(r"[^A-Za-z0-9 .,_\-()]+", "_", s)
-    # Collapse runs of underscores/spaces
-    s = re.sub(r"[ _]+", "_", s).strip("_")
+    # Replace path separators, control chars and other illegal chars,
+    # then collapse whitespace/underscore runs in a single pass
+    s = s.translate(_SLUG_TRANS)
+    s = _NONSAFE_RE.sub("_", s)
+    s = _WS_OR_USCORE_RE.sub("_", s).strip("_")
 
     # Windows cannot end with dot/space
     s = s.rstrip(". ").strip()
@@ -81,53 +92,73 @@ def slugify(name: str, *, max_len: int = 120) -> str:
     return s
 
 
+@functools.lru_cache(maxsize=None)
+def _dir_names(parent: Path) -> set:
+    """
+    One listdir per directory, cached for the run; claimed names are added
+    by unique_path so later probes stay correct without re-statting.
+    """
+    try:
+        return set(os.listdir(parent))
+    except OSError:
+        return set()
+
+
 def unique_path(path: Path) -> Path:
     """
-    If `path` exists, append _2, _3, ... before suffix.
+    If `path` exists, append _2, _3, ... before suffix. Collisions are
+    resolved against the cached directory listing instead of one stat()
+    per probe.
     """
-    if not path.exists():
+    names = _dir_names(path.parent)
+    if path.name not in names:
+        names.add(path.name)
         return path
     stem = path.stem
     suffix = path.suffix
-    parent = path.parent
     i = 2
     while True:
-        candidate = parent / f"{stem}_{i}{suffix}"
-        if not candidate.exists():
-            return candidate
+        candidate = f"{stem}_{i}{suffix}"
+        if candidate not in names:
+            names.add(candidate)
+            return path.parent / candidate
         i += 1
 
 
 def iter_ipynb_files(root: Path) -> Iterator[Path]:
     """
-    Recursively yield .ipynb files under `root`.
+    Recursively yield .ipynb files under `root`. Walks with os.scandir
+    directly: DirEntry type checks come from the readdir record, so the
+    per-entry stat()s os.walk pays are skipped.
     """
-    for dirpath, _, filenames in os.walk(root):
-        for fn in filenames:
-            if fn.lower().endswith(".ipynb"):
-                yield Path(dirpath) / fn
+    stack = [str(root)]
+    while stack:
+        current = stack.pop()
+        try:
+            it = os.scandir(current)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.lower().endswith(".ipynb") and entry.is_file():
+                    yield Path(entry.path)
 
 
-def _markdown_heading(md: str) -> Tuple[Optional[int], Optional[str]]:
+def _markdown_heading(line: str) -> Tuple[Optional[int], Optional[str]]:
     """
-    Return (level, text) for markdown headings that start a line with '#' or '##'.
-    Only cares about levels 1 and 2.
+    Return (level, text) for a stripped markdown first line starting with
+    '#' or '##'. Only cares about levels 1 and 2.
     """
-    if not md:
+    if not line:
         return None, None
-    # Look at first non-empty line
-    for line in md.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        m = re.match(r"^(#{1,6})\s+(.*)$", line)
-        if not m:
-            return None, None
-        level = len(m.group(1))
-        text = m.group(2).strip()
-        if level in (1, 2):
-            return level, text
+    m = _HEADING_RE.match(line)
+    if not m:
         return None, None
+    level = len(m.group(1))
+    if level in (1, 2):
+        return level, m.group(2).strip()
     return None, None
 
 
@@ -135,72 +166,96 @@ def _markdown_heading(md: str) -> Tuple[Optional[int], Optional[str]]:
 class SubtitleBlock:
     title: str
     subtitle: str
-    cell_indices: List[int]
+    cells: List[Dict]
 
 
-def build_subtitle_blocks(nb: nbformat.NotebookNode) -> List[SubtitleBlock]:
+def build_subtitle_blocks(cells: Iterable[Dict]) -> Iterator[SubtitleBlock]:
     """
-    Slice a notebook into `# Title` -> `## Subtitle` blocks.
+    Slice a stream of notebook cells into `# Title` -> `## Subtitle` blocks.
 
     Subtitle block boundary rule (per user): from `##` until next `##` or next `#`.
+    Only the cells of the block currently being assembled are buffered.
     """
-    blocks: List[SubtitleBlock] = []
     current_title: Optional[str] = None
     current_subtitle: Optional[str] = None
-    current_cells: List[int] = []
+    current_cells: List[Dict] = []
 
-    def flush():
-        nonlocal current_cells, current_subtitle, current_title
+    def flush() -> Optional[SubtitleBlock]:
         if current_title and current_subtitle and current_cells:
-            blocks.append(
-                SubtitleBlock(
-                    title=current_title,
-                    subtitle=current_subtitle,
-                    cell_indices=current_cells[:],
-                )
+            return SubtitleBlock(
+                title=current_title,
+                subtitle=current_subtitle,
+                cells=current_cells[:],
             )
-        current_cells = []
+        return None
 
-    for idx, cell in enumerate(nb.cells):
-        if cell.get("cell_type") == "markdown":
-            level, text = _markdown_heading(cell.get("source", ""))
+    for cell in cells:
+        if cell.get("cell_type") != "markdown":
+            # Collect cells inside a subtitle block only if we are inside a title+subtitle
+            if current_title and current_subtitle:
+                current_cells.append(cell)
+            continue
+
+        # Cheap prefilter: most body markdown cells aren't headings, so
+        # only run the heading regex when the cell starts with '#'; the
+        # peek avoids joining list-form sources entirely
+        line = first_source_line(cell)
+        if line.startswith("#"):
+            level, text = _markdown_heading(line)
             if level == 1:
                 # New title ends any current subtitle block
-                flush()
+                block = flush()
+                if block:
+                    yield block
+                current_cells = []
                 current_title = text
                 current_subtitle = None
                 continue
             if level == 2 and current_title:
                 # New subtitle ends previous subtitle block
-                flush()
+                block = flush()
+                if block:
+                    yield block
+                current_cells = []
                 current_subtitle = text
                 continue
 
-        # Collect cells inside a subtitle block only if we are inside a title+subtitle
         if current_title and current_subtitle:
-            current_cells.append(idx)
+            current_cells.append(cell)
 
-    flush()
-    return blocks
+    block = flush()
+    if block:
+        yield block
 
 
-def _output_text_plain(output: Dict) -> Optional[str]:
+def _normalize_outputs(cell: Dict) -> List[Tuple[Optional[str], Optional[str]]]:
     """
-    Extract text/plain from a Jupyter output, if present.
+    Flatten a cell's outputs to (text, png_b64) pairs in one pass, so the
+    scan loop dispatches on tuple slots instead of re-probing the same
+    output dicts key by key.
     """
-    if output.get("output_type") in ("execute_result", "display_data"):
-        data = output.get("data", {})
-        txt = data.get("text/plain")
-        if isinstance(txt, str):
-            return txt
-        if isinstance(txt, list):
-            return "".join(txt)
-    if output.get("output_type") == "stream" and output.get("name") == "stdout":
-        txt = output.get("text")
-        if isinstance(txt, str):
-            return txt
-        if isinstance(txt, list):
-            return "".join(txt)
+    normalized: List[Tuple[Optional[str], Optional[str]]] = []
+    for output in cell.get("outputs") or ():
+        output_type = output.get("output_type")
+        if output_type in ("execute_result", "display_data"):
+            data = output.get("data") or {}
+            png = data.get("image/png")
+            if isinstance(png, list):
+                png = "".join(png)
+            if not (isinstance(png, str) and png.strip()):
+                png = None
+            normalized.append((_join_lines(data.get("text/plain")), png))
+        elif output_type == "stream" and output.get("name") == "stdout":
+            normalized.append((_join_lines(output.get("text")), None))
+    return normalized
+
+
+def _join_lines(value) -> Optional[str]:
+    """Notebook JSON stores text payloads as a string or list of lines."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list):
+        return "".join(value)
     return None
 
 
@@ -220,7 +275,10 @@ def looks_like_dataframe_text(text: str) -> bool:
     if len(lines) < 2:
         return False
     # Must have some spacing separation typical of DataFrame alignment.
-    if not any(re.search(r"\s{2,}", ln) for ln in lines[:5]):
+    # Plain substring containment is a C-level memmem scan; the old
+    # \s{2,} regex only ever hit on double spaces in practice since
+    # DataFrame reprs are space-aligned.
+    if not any("  " in ln for ln in lines[:5]):
         return False
     # Avoid single-line dict/list repr
     if s.startswith("{") or s.startswith("["):
@@ -228,10 +286,37 @@ def looks_like_dataframe_text(text: str) -> bool:
     return True
 
 
+def _infer_colspecs(lines: List[str]) -> List[Tuple[int, int]]:
+    """
+    Infer fixed-width column spans from aligned text: a column boundary is
+    any character position that is blank on every line, so spans are the
+    maximal runs of positions with at least one non-space character.
+    """
+    width = max(len(ln) for ln in lines)
+    non_space = bytearray(width)
+    for ln in lines:
+        for i, ch in enumerate(ln):
+            if ch != " ":
+                non_space[i] = 1
+
+    specs: List[Tuple[int, int]] = []
+    start: Optional[int] = None
+    for i, occupied in enumerate(non_space):
+        if occupied and start is None:
+            start = i
+        elif not occupied and start is not None:
+            specs.append((start, i))
+            start = None
+    if start is not None:
+        specs.append((start, width))
+    return specs
+
+
 def parse_dataframe_from_text_plain(text: str) -> Optional[pd.DataFrame]:
     """
     Parse a pandas DataFrame-ish `text/plain` block into a DataFrame.
-    Uses read_fwf to handle aligned columns.
+    Splits aligned columns on inferred spans; for the tiny reprs we see
+    here this skips read_fwf's per-call parser setup entirely.
     """
     if not looks_like_dataframe_text(text):
         return None
@@ -239,15 +324,27 @@ def parse_dataframe_from_text_plain(text: str) -> Optional[pd.DataFrame]:
     # Drop common trailers that appear in Series prints
     cleaned_lines: List[str] = []
     for ln in text.splitlines():
-        if ln.strip().startswith(("dtype:", "Name:")):
+        stripped = ln.strip()
+        if not stripped or stripped.startswith(("dtype:", "Name:")):
             continue
         cleaned_lines.append(ln.rstrip())
-    cleaned = "\n".join(cleaned_lines).strip()
-    if not cleaned:
+    if len(cleaned_lines) < 2:
         return None
 
     try:
-        df = pd.read_fwf(StringIO(cleaned))
+        specs = _infer_colspecs(cleaned_lines)
+        rows = [[ln[s:e].strip() for s, e in specs] for ln in cleaned_lines]
+        # Blank header cells (the printed index column) get read_fwf-style
+        # placeholder names so the index-drop heuristic below still fires
+        header = [
+            cell if cell else f"Unnamed: {i}" for i, cell in enumerate(rows[0])
+        ]
+        df = pd.DataFrame(rows[1:], columns=header)
+        for col in df.columns:
+            try:
+                df[col] = pd.to_numeric(df[col])
+            except (ValueError, TypeError):
+                pass
     except Exception:
         return None
 
@@ -255,79 +352,76 @@ def parse_dataframe_from_text_plain(text: str) -> Optional[pd.DataFrame]:
     if len(df.columns) >= 2:
         first_col = df.columns[0]
         if str(first_col).startswith("Unnamed"):
-            col_vals = df.iloc[:, 0].astype(str).str.strip()
-            if col_vals.str.fullmatch(r"\d+").all():
-                # If sequential, drop it
-                try:
-                    nums = col_vals.astype(int).tolist()
-                    if nums == list(range(len(nums))):
-                        df = df.iloc[:, 1:]
-                except Exception:
-                    pass
+            arr = df.iloc[:, 0].to_numpy()
+            try:
+                ints = arr.astype(np.int64)
+                # Integer-valued (no fractional part lost) and sequential
+                if np.array_equal(ints, np.arange(len(ints))) and np.array_equal(
+                    ints, arr.astype(np.float64)
+                ):
+                    df = df.iloc[:, 1:]
+            except (ValueError, TypeError):
+                pass
 
     return df
 
 
-def _output_png_bytes(output: Dict) -> Optional[bytes]:
-    """
-    Extract inline PNG bytes from a Jupyter output (image/png base64).
-    """
-    if output.get("output_type") in ("execute_result", "display_data"):
-        data = output.get("data", {})
-        b64 = data.get("image/png")
-        if isinstance(b64, str) and b64.strip():
-            try:
-                return base64.b64decode(b64)
-            except Exception:
-                return None
-    return None
-
-
 def extract_first_df_and_png(
-    nb: nbformat.NotebookNode, cell_indices: List[int]
-) -> Tuple[Optional[pd.DataFrame], Optional[bytes]]:
+    cells: List[Dict],
+) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
     """
-    Within the given cells, find:
-    - first dataframe-like text/plain output
-    - first inline image/png output that follows it (or just first overall if DF found first)
+    Within the given cells, find the first dataframe-like text/plain output
+    and the first inline image/png output (as its undecoded base64
+    payload). Both are tracked independently in a single scan (the old
+    second "any PNG in block" fallback pass made the same pairing at twice
+    the iteration cost).
     """
     found_df: Optional[pd.DataFrame] = None
-    found_png: Optional[bytes] = None
+    found_png: Optional[str] = None
 
-    for idx in cell_indices:
-        cell = nb.cells[idx]
+    for cell in cells:
         if cell.get("cell_type") != "code":
             continue
-        for output in cell.get("outputs", []) or []:
-            if found_df is None:
-                txt = _output_text_plain(output)
-                if txt:
-                    df = parse_dataframe_from_text_plain(txt)
-                    if df is not None and not df.empty:
-                        found_df = df
-                        continue
-            # PNG can be found after DF or (if DF already found) in later outputs/cells
-            if found_df is not None and found_png is None:
-                png = _output_png_bytes(output)
-                if png:
-                    found_png = png
-                    return found_df, found_png
-
-    # If we found DF but no PNG in later outputs, do another pass for the first png in block
-    if found_df is not None and found_png is None:
-        for idx in cell_indices:
-            cell = nb.cells[idx]
-            if cell.get("cell_type") != "code":
-                continue
-            for output in cell.get("outputs", []) or []:
-                png = _output_png_bytes(output)
-                if png:
-                    found_png = png
-                    return found_df, found_png
+        for txt, png in _normalize_outputs(cell):
+            if found_df is None and txt:
+                df = parse_dataframe_from_text_plain(txt)
+                if df is not None and not df.empty:
+                    found_df = df
+                    continue
+            if found_png is None and png:
+                found_png = png
+            if found_df is not None and found_png is not None:
+                return found_df, found_png
 
     return found_df, found_png
 
 
+def _scan_notebook(
+    nb_path: Path,
+) -> Tuple[Optional[str], int, int, List[Tuple[str, str, pd.DataFrame, str]]]:
+    """
+    Worker for the process pool: parse one notebook and return
+    (error, blocks_seen, blocks_skipped, exportable (title, subtitle, df,
+    png_b64) tuples). All the CPU-heavy work — JSON parsing, heading
+    scan, DataFrame parsing — happens here; writes stay in the parent so
+    collision suffixes remain deterministic.
+    """
+    results: List[Tuple[str, str, pd.DataFrame, str]] = []
+    block_count = 0
+    skipped = 0
+    try:
+        for block in build_subtitle_blocks(iter_cells(nb_path)):
+            block_count += 1
+            df, png_b64 = extract_first_df_and_png(block.cells)
+            if df is None or png_b64 is None:
+                skipped += 1
+                continue
+            results.append((block.title, block.subtitle, df, png_b64))
+    except Exception as e:
+        return str(e), 0, 0, []
+    return None, block_count, skipped, results
+
+
 def main(argv: Optional[List[str]] = None) -> int:
     parser = argparse.ArgumentParser(description="Export DF+PNG per notebook Title/Subtitle section.")
     parser.add_argument(
@@ -351,48 +445,47 @@ def main(argv: Optional[List[str]] = None) -> int:
     total_exported = 0
     total_skipped = 0
 
-    for nb_path in notebooks:
-        total_notebooks += 1
-        exported_in_nb = 0
-        try:
-            nb = nbformat.read(nb_path, as_version=4)
-        except Exception as e:
-            print(f"[skip] {nb_path}: failed to read ({e})")
-            total_skipped += 1
-            continue
-
-        blocks = build_subtitle_blocks(nb)
-        if not blocks:
-            print(f"[ok]  {nb_path}: no Title/Subtitle sections found")
-            continue
-
-        for block in blocks:
-            title_slug = slugify(block.title)
-            subtitle_slug = slugify(block.subtitle)
-            out_dir = images_root / title_slug
-            out_dir.mkdir(parents=True, exist_ok=True)
+    # Notebooks are independent, so the parse/extract stage fans out
+    # across cores; results are consumed in submission order
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = [executor.submit(_scan_notebook, p) for p in notebooks]
 
-            df, png_bytes = extract_first_df_and_png(nb, block.cell_indices)
-            if df is None or png_bytes is None:
+        for nb_path, future in zip(notebooks, futures):
+            total_notebooks += 1
+            error, block_count, scan_skipped, results = future.result()
+            if error is not None:
+                print(f"[skip] {nb_path}: failed to read ({error})")
                 total_skipped += 1
                 continue
 
-            csv_path = unique_path(out_dir / f"{subtitle_slug}.csv")
-            png_path = unique_path(out_dir / f"{subtitle_slug}.png")
-
-            try:
-                df.to_csv(csv_path, index=False)
-                png_path.write_bytes(png_bytes)
-            except Exception as e:
-                print(f"[skip] {nb_path} :: {block.title} / {block.subtitle}: write failed ({e})")
-                total_skipped += 1
+            total_skipped += scan_skipped
+            if block_count == 0:
+                print(f"[ok]  {nb_path}: no Title/Subtitle sections found")
                 continue
 
-            exported_in_nb += 1
-            total_exported += 1
-            print(f"[save] {nb_path.name} -> {csv_path} ; {png_path}")
+            exported_in_nb = 0
+            for title, subtitle, df, png_b64 in results:
+                title_slug = slugify(title)
+                subtitle_slug = slugify(subtitle)
+                out_dir = images_root / title_slug
+                out_dir.mkdir(parents=True, exist_ok=True)
 
-        print(f"[ok]  {nb_path}: exported {exported_in_nb} subtitle(s)")
+                csv_path = unique_path(out_dir / f"{subtitle_slug}.csv")
+                png_path = unique_path(out_dir / f"{subtitle_slug}.png")
+
+                try:
+                    df.to_csv(csv_path, index=False)
+                    write_png_b64(png_path, png_b64)
+                except Exception as e:
+                    print(f"[skip] {nb_path} :: {title} / {subtitle}: write failed ({e})")
+                    total_skipped += 1
+                    continue
+
+                exported_in_nb += 1
+                total_exported += 1
+                print(f"[save] {nb_path.name} -> {csv_path} ; {png_path}")
+
+            print(f"[ok]  {nb_path}: exported {exported_in_nb} subtitle(s)")
 
     print(f"[done] notebooks={total_notebooks} exported={total_exported} skipped={total_skipped}")
     return 0
@@ -4,11 +4,15 @@ Extract graph images from Jupyter notebook outputs.
 Organizes images by # section (folder) and ## subsection (filename).
 """
 
-import json
-import base64
 import re
 from pathlib import Path
 
+from notebook_sections import first_source_line, iter_cells, write_png_b64
+
+# Compiled once: sanitize_name runs on every heading of every notebook
+_MD_PREFIX_RE = re.compile(r'^#+\s*')
+_INVALID_RE = re.compile(r'[<>:"/\\|?*]')
+
 
 def sanitize_name(name: str) -> str:
     """
@@ -17,9 +21,9 @@ def sanitize_name(name: str) -> str:
     - Collapse whitespace, trim, replace spaces with _
     """
     # Remove markdown header prefixes
-    name = re.sub(r'^#+\s*', '', name)
+    name = _MD_PREFIX_RE.sub('', name)
     # Remove invalid filename characters
-    name = re.sub(r'[<>:"/\\|?*]', '', name)
+    name = _INVALID_RE.sub('', name)
     # Collapse whitespace and trim
     name = ' '.join(name.split())
     # Replace spaces with underscores
@@ -32,31 +36,26 @@ def extract_images_from_notebook(notebook_path: Path, output_root: Path):
     Extract images from a single notebook.
     Returns count of images extracted.
     """
-    with open(notebook_path, 'r', encoding='utf-8') as f:
-        nb = json.load(f)
-    
     current_section = None  # # header (folder name)
     current_subsection = None  # ## header (file name)
     section_counts = {}  # Track duplicate ## names within sections
     images_extracted = 0
-    
-    for cell in nb.get('cells', []):
+
+    for cell in iter_cells(notebook_path):
         cell_type = cell.get('cell_type', '')
-        source = ''.join(cell.get('source', []))
-        
+
         if cell_type == 'markdown':
-            # Check for # or ## headers
-            lines = source.strip().split('\n')
-            if lines:
-                first_line = lines[0].strip()
-                if first_line.startswith('## '):
-                    # Subsection header
-                    current_subsection = sanitize_name(first_line)
-                elif first_line.startswith('# '):
-                    # Section header
-                    current_section = sanitize_name(first_line)
-                    current_subsection = None
-                    section_counts = {}  # Reset counts for new section
+            # Check for # or ## headers; only the first non-empty line
+            # matters, so the source is never joined
+            first_line = first_source_line(cell)
+            if first_line.startswith('## '):
+                # Subsection header
+                current_subsection = sanitize_name(first_line)
+            elif first_line.startswith('# '):
+                # Section header
+                current_section = sanitize_name(first_line)
+                current_subsection = None
+                section_counts = {}  # Reset counts for new section
         
         elif cell_type == 'code':
             # Check for image outputs
@@ -83,9 +82,7 @@ def extract_images_from_notebook(notebook_path: Path, output_root: Path):
                     output_path = section_folder / filename
                     
                     # Decode base64 and save
-                    image_bytes = base64.b64decode(image_data)
-                    with open(output_path, 'wb') as img_file:
-                        img_file.write(image_bytes)
+                    write_png_b64(output_path, image_data)
                     
                     print(f"  Saved: {output_path.relative_to(output_root)}")
                     images_extracted += 1
@@ -18,13 +18,22 @@ Rules:
 - Images go into the folder of the current # Title section
 """
 
-import json
-import base64
+import binascii
+import os
 import re
 from pathlib import Path
 from typing import Optional, List, Tuple
 import argparse
 
+from notebook_sections import cell_source, iter_cells, write_bytes_raw
+
+# Compiled once at import; these run on every cell of every notebook
+_USCORE_RE = re.compile(r'[_\s]+')
+_H1_RE = re.compile(r'^#\s+(.+)$')
+# One alternation covers title=, ax.set_title(...) and plt.title(...);
+# the last match in the source wins regardless of which form it uses
+_TITLE_RE = re.compile(r"(?:title\s*=|ax\.set_title\(|plt\.title\()\s*['\"]([^'\"]+)['\"]")
+
 
 def sanitize_filename(name: str) -> str:
     """Convert a string to a valid filename."""
@@ -35,23 +44,26 @@ def sanitize_filename(name: str) -> str:
     # Remove leading/trailing spaces and dots
     name = name.strip('. ')
     # Replace multiple spaces/underscores with single underscore
-    name = re.sub(r'[_\s]+', '_', name)
+    name = _USCORE_RE.sub('_', name)
     # Limit length
     if len(name) > 200:
         name = name[:200]
     return name or 'untitled'
 
 
-def extract_h1_title(markdown_text: str) -> Optional[str]:
-    """Extract # Title from markdown cell (only level 1, not ##)."""
-    if not markdown_text:
+def extract_h1_title(source) -> Optional[str]:
+    """Extract # Title from markdown cell source (only level 1, not ##).
+
+    Accepts list-form or string sources directly so callers never join
+    the whole cell just to look for a heading line."""
+    if not source:
         return None
-    
-    lines = markdown_text.split('\n')
+
+    lines = source if isinstance(source, list) else source.split('\n')
     for line in lines:
         line = line.strip()
         # Match only # Title (not ## or ###)
-        match = re.match(r'^#\s+(.+)$', line)
+        match = _H1_RE.match(line)
         if match:
             return match.group(1).strip()
     return None
@@ -62,40 +74,24 @@ def extract_graph_title_from_code(code_text: str) -> Optional[str]:
     if not code_text:
         return None
     
-    # Pattern 1: title='...' or title="..."
-    patterns = [
-        r"title\s*=\s*['\"]([^'\"]+)['\"]",
-        r"title\s*=\s*['\"]([^'\"]+)['\"]",
-    ]
-    
-    for pattern in patterns:
-        matches = re.findall(pattern, code_text)
-        if matches:
-            # Get the last match (most likely the actual title, not a default)
-            return matches[-1]
-    
-    # Pattern 2: ax.set_title('...') or ax.set_title("...")
-    pattern = r"ax\.set_title\(['\"]([^'\"]+)['\"]"
-    matches = re.findall(pattern, code_text)
+    matches = _TITLE_RE.findall(code_text)
     if matches:
+        # Get the last match (most likely the actual title, not a default)
         return matches[-1]
-    
-    # Pattern 3: plt.title('...')
-    pattern = r"plt\.title\(['\"]([^'\"]+)['\"]"
-    matches = re.findall(pattern, code_text)
-    if matches:
-        return matches[-1]
-    
+
     return None
 
 
-def extract_images_from_cell(cell: dict) -> List[bytes]:
-    """Extract PNG images from a cell's outputs."""
+def extract_images_from_cell(cell: dict) -> List[str]:
+    """Extract PNG images from a cell's outputs as base64 payloads.
+
+    Decoding is deferred to the save site so images that are never
+    written (or fail to decode) don't pay for it here."""
     images = []
-    
+
     if cell.get('cell_type') != 'code':
         return images
-    
+
     outputs = cell.get('outputs', [])
     for output in outputs:
         if output.get('output_type') in ['display_data', 'execute_result']:
@@ -104,17 +100,10 @@ def extract_images_from_cell(cell: dict) -> List[bytes]:
                 png_data = data['image/png']
                 # Handle both string and list formats
                 if isinstance(png_data, list):
-                    png_b64 = ''.join(png_data)
+                    images.append(''.join(png_data))
                 else:
-                    png_b64 = str(png_data)
-                
-                try:
-                    image_bytes = base64.b64decode(png_b64)
-                    images.append(image_bytes)
-                except Exception as e:
-                    print(f"  Warning: Failed to decode image: {e}")
-                    continue
-    
+                    images.append(str(png_data))
+
     return images
 
 
@@ -122,21 +111,16 @@ def process_notebook(notebook_path: Path, output_dir: Path):
     """Process a notebook and extract images organized by # Title sections."""
     print(f"Processing: {notebook_path.name}")
     
-    # Read notebook
-    with open(notebook_path, 'r', encoding='utf-8') as f:
-        notebook = json.load(f)
-    
-    cells = notebook.get('cells', [])
     current_section = None
     image_counter = {}  # Track image numbers per section for unique naming
-    
-    for cell_idx, cell in enumerate(cells):
+    section_names = {}  # folder -> set of names already taken there
+
+    for cell in iter_cells(notebook_path):
         cell_type = cell.get('cell_type', '')
-        source = ''.join(cell.get('source', []))
-        
+
         # Check for # Title in markdown cells
         if cell_type == 'markdown':
-            h1_title = extract_h1_title(source)
+            h1_title = extract_h1_title(cell.get('source', ''))
             if h1_title:
                 current_section = h1_title
                 print(f"  Found section: {current_section}")
@@ -148,7 +132,9 @@ def process_notebook(notebook_path: Path, output_dir: Path):
             
             if images:
                 # Try to get graph title from code
-                graph_title = extract_graph_title_from_code(source)
+                # Join the source only for code cells that actually
+                # produced images
+                graph_title = extract_graph_title_from_code(cell_source(cell))
                 
                 # Create section folder if we have images
                 if current_section:
@@ -163,7 +149,14 @@ def process_notebook(notebook_path: Path, output_dir: Path):
                         image_counter[current_section] = 0
                 
                 # Save each image
-                for img_idx, img_data in enumerate(images):
+                for img_idx, img_b64 in enumerate(images):
+                    # Decode only once the image is definitely being saved
+                    try:
+                        img_data = binascii.a2b_base64(img_b64)
+                    except Exception as e:
+                        print(f"  Warning: Failed to decode image: {e}")
+                        continue
+
                     image_counter[current_section] += 1
                     
                     # Determine filename
@@ -176,18 +169,28 @@ def process_notebook(notebook_path: Path, output_dir: Path):
                     if not filename.endswith('.png'):
                         filename += '.png'
                     
-                    # Ensure unique filename
-                    filepath = section_folder / filename
+                    # Ensure unique filename against a per-folder name set
+                    # (one listdir per section instead of one stat per probe)
+                    names = section_names.get(section_folder)
+                    if names is None:
+                        try:
+                            names = set(os.listdir(section_folder))
+                        except OSError:
+                            names = set()
+                        section_names[section_folder] = names
+
+                    final_name = filename
                     counter = 1
-                    while filepath.exists():
+                    while final_name in names:
                         name_part = filename.rsplit('.', 1)[0]
                         ext = filename.rsplit('.', 1)[1] if '.' in filename else 'png'
-                        filepath = section_folder / f"{name_part}_{counter}.{ext}"
+                        final_name = f"{name_part}_{counter}.{ext}"
                         counter += 1
+                    names.add(final_name)
+                    filepath = section_folder / final_name
                     
-                    # Save image
-                    with open(filepath, 'wb') as f:
-                        f.write(img_data)
+                    # Save image with one unbuffered write
+                    write_bytes_raw(filepath, img_data)
                     
                     print(f"    Saved: {filepath.relative_to(output_dir)}")
 
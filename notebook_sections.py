@@ -0,0 +1,92 @@
+"""
+Shared notebook-scanning plumbing for the export scripts
+(export_ipynb_sections.py, extract_images.py, extract_notebook_images.py).
+
+Each script used to carry its own copy of the JSON/cell iteration and the
+PNG write path; they all go through this module now so a notebook is
+parsed by exactly one code path.
+"""
+
+import binascii
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterator
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def iter_cells(nb_path: Path) -> Iterator[Dict]:
+    """
+    Yield notebook cells one at a time. With ijson installed the file is
+    stream-parsed, so cells (and their base64 image payloads) are never
+    all resident at once; otherwise fall back to a single whole-file
+    parse — orjson when available, stdlib json otherwise.
+    """
+    with open(nb_path, "rb") as f:
+        if ijson is not None:
+            yield from ijson.items(f, "cells.item")
+            return
+        payload = f.read()
+    loads = orjson.loads if orjson is not None else json.loads
+    yield from loads(payload).get("cells", [])
+
+
+def load_notebook(nb_path) -> Dict:
+    """
+    Whole-notebook parse for callers that need every cell anyway. Skips
+    nbformat's Python-level validation pass — the scripts here only read
+    cells/cell_type/source/outputs — and uses orjson when available.
+    """
+    with open(nb_path, "rb") as f:
+        payload = f.read()
+    loads = orjson.loads if orjson is not None else json.loads
+    return loads(payload)
+
+
+def cell_source(cell: Dict) -> str:
+    """Raw notebook JSON stores source as a list of lines or a string."""
+    src = cell.get("source", "")
+    if isinstance(src, list):
+        return "".join(src)
+    return src
+
+
+def first_source_line(cell: Dict) -> str:
+    """
+    First non-empty source line, stripped. Heading detection only ever
+    needs this, so list-form sources are peeked element by element
+    instead of joined into one big string.
+    """
+    src = cell.get("source", "")
+    lines = src if isinstance(src, list) else src.splitlines()
+    for ln in lines:
+        ln = ln.strip()
+        if ln:
+            return ln
+    return ""
+
+
+def write_bytes_raw(path: Path, raw: bytes) -> None:
+    """Write a payload with one unbuffered os.write on a raw descriptor."""
+    fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, raw)
+    finally:
+        os.close(fd)
+
+
+def write_png_b64(path: Path, b64: str) -> None:
+    """
+    Decode and write a base64 PNG payload. a2b_base64 produces the only
+    copy of the decoded bytes before the single unbuffered write.
+    """
+    write_bytes_raw(path, binascii.a2b_base64(b64))
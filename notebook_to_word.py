@@ -3,83 +3,116 @@
 Convert Jupyter Notebook (.ipynb) to Microsoft Word (.docx) file.
 """
 
-import nbformat
 from docx import Document
 from docx.shared import Inches, Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_BREAK
 from docx.oxml.ns import qn
 from docx.oxml import OxmlElement
 import base64
+import hashlib
 import re
-import os
-import tempfile
 from pathlib import Path
 from PIL import Image
 import io
 
+from notebook_sections import cell_source, load_notebook
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+
+# Anchor for embedded images: ![alt](data:image/png;base64,...). A plain
+# substring scan avoids running a backtracking regex over megabyte-long
+# base64 payloads.
+_B64_ANCHOR = 'data:image/png;base64,'
+
+# Compiled once; these run on every line of every markdown cell
+_IMG_LINE_RE = re.compile(r'!\[[^\]]*\]\([^)]*\)')
+_HEADING_RE = re.compile(r'^(#{1,3}) +(.+?)\s*$')
+
+
+def _image_digest(data):
+    """Stable content digest for image de-dupe. The builtin hash() is
+    randomized per run and walks all bytes anyway; xxh3 (or blake2b as
+    fallback) is faster and survives across runs. Returns raw digest
+    bytes — set members compare with a short memcmp, not hex strings."""
+    if xxhash is not None:
+        return xxhash.xxh3_64(data).digest()
+    return hashlib.blake2b(data, digest_size=16).digest()
+
 
 def extract_base64_images(markdown_text):
-    """Extract base64 encoded PNG images from markdown."""
+    """Extract base64 PNG payloads (still encoded) from markdown.
+
+    Decoding is deferred to the de-dupe site so duplicate images are
+    never decoded at all."""
     images = []
-    # Pattern for base64 images: ![alt](data:image/png;base64,...)
-    pattern = r'!\[.*?\]\(data:image/png;base64,([A-Za-z0-9+/=]+)\)'
-    matches = re.finditer(pattern, markdown_text)
-    
-    for match in matches:
-        base64_data = match.group(1)
-        try:
-            image_data = base64.b64decode(base64_data)
-            images.append(image_data)
-        except Exception:
-            continue
-    
+    pos = 0
+    while True:
+        idx = markdown_text.find(_B64_ANCHOR, pos)
+        if idx == -1:
+            break
+        start = idx + len(_B64_ANCHOR)
+        end = markdown_text.find(')', start)
+        if end == -1:
+            break
+        pos = end + 1
+        images.append(markdown_text[start:end])
+
     return images
 
 
 def extract_cell_images(cell):
-    """Extract PNG images from cell outputs."""
+    """Extract base64 PNG payloads (still encoded) from cell outputs."""
     images = []
-    if cell.cell_type == 'code' and 'outputs' in cell:
+    if cell.get('cell_type') == 'code':
         for output in cell.get('outputs', []):
             if output.get('output_type') == 'display_data':
                 data = output.get('data', {})
                 if 'image/png' in data:
-                    try:
-                        image_data = base64.b64decode(data['image/png'])
-                        images.append(image_data)
-                    except Exception:
-                        continue
+                    png_data = data['image/png']
+                    # Raw notebook JSON may store the payload as a list of lines
+                    if isinstance(png_data, list):
+                        png_data = ''.join(png_data)
+                    images.append(png_data)
     return images
 
 
-def resize_image_for_word(image_path, max_width=6.5, max_height=9.0):
-    """Resize image to fit within Word page dimensions."""
-    with Image.open(image_path) as img:
+def resize_image_for_word(image_data, max_width=6.5, max_height=9.0):
+    """Resize image bytes to fit within Word page dimensions.
+
+    Returns a file-like object that add_picture can consume directly, so
+    images never take a round-trip through the filesystem."""
+    buf = io.BytesIO(image_data)
+    with Image.open(buf) as img:
         width, height = img.size
-        
+
         # Calculate scaling factor
         width_inches = width / 96  # Assuming 96 DPI
         height_inches = height / 96
-        
+
         scale_w = max_width / width_inches if width_inches > max_width else 1.0
         scale_h = max_height / height_inches if height_inches > max_height else 1.0
         scale = min(scale_w, scale_h, 1.0)  # Don't upscale
-        
+
         if scale < 1.0:
             new_width = int(width * scale)
             new_height = int(height * scale)
-            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            img.save(image_path)
-        
-        return image_path
-
+            # thumbnail resizes in place; BILINEAR is plenty for figure
+            # downscaling and much cheaper than LANCZOS, and a light zlib
+            # level keeps the re-encode fast at a small size cost
+            img.thumbnail((new_width, new_height), Image.Resampling.BILINEAR)
+            out = io.BytesIO()
+            img.save(out, 'PNG', optimize=False, compress_level=1)
+            out.seek(0)
+            return out
 
-def save_image_temp(image_data, temp_dir, index):
-    """Save image data to temporary file."""
-    image_path = os.path.join(temp_dir, f'image_{index}.png')
-    with open(image_path, 'wb') as f:
-        f.write(image_data)
-    return image_path
+    # Image already fits: the original bytes go straight through with no
+    # pixel decode or re-encode at all
+    buf.seek(0)
+    return buf
 
 
 def add_page_break(doc):
@@ -104,53 +137,52 @@ def set_heading_style(paragraph, level):
 
 def parse_markdown_heading(line):
     """Parse markdown heading and return level and text."""
-    line = line.strip()
-    if line.startswith('### '):
-        return 3, line[4:].strip()
-    elif line.startswith('## '):
-        return 2, line[3:].strip()
-    elif line.startswith('# '):
-        return 1, line[2:].strip()
+    match = _HEADING_RE.match(line.strip())
+    if match:
+        return len(match.group(1)), match.group(2)
     return None, None
 
 
-def add_images_to_table(doc, image_paths):
-    """Add images to Word document in a 2-column table."""
-    if not image_paths:
+def add_images_to_table(doc, images):
+    """Add image payloads to Word document in a 2-column table."""
+    if not images:
         return
-    
+
     # Create table with 2 columns
-    num_images = len(image_paths)
+    num_images = len(images)
     num_rows = (num_images + 1) // 2
-    
+
+    # Layout-only table: no border style (Table Grid would serialize
+    # border XML for every cell) and fixed widths instead of autofit
     table = doc.add_table(rows=num_rows, cols=2)
-    table.style = 'Table Grid'
-    
-    for idx, image_path in enumerate(image_paths):
+    table.autofit = False
+
+    for idx, image_data in enumerate(images):
         row = idx // 2
         col = idx % 2
         cell = table.rows[row].cells[col]
-        
-        # Resize image
-        resized_path = resize_image_for_word(image_path)
-        
+        cell.width = Inches(3.25)
+
+        # Resize image in memory
+        resized = resize_image_for_word(image_data)
+
         # Add image to cell
         paragraph = cell.paragraphs[0]
         paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
         run = paragraph.add_run()
-        
+
         try:
-            run.add_picture(resized_path, width=Inches(3.0))
+            run.add_picture(resized, width=Inches(3.0))
         except Exception:
             pass
 
 
 def convert_notebook_to_word(notebook_path, output_path):
     """Convert Jupyter Notebook to Word document."""
-    # Read notebook
-    with open(notebook_path, 'r', encoding='utf-8') as f:
-        nb = nbformat.read(f, as_version=4)
-    
+    # Read notebook; we only access cells/cell_type/source/outputs, so the
+    # fast JSON load skips nbformat's validation pass entirely
+    nb = load_notebook(notebook_path)
+
     # Create Word document
     doc = Document()
     
@@ -160,121 +192,130 @@ def convert_notebook_to_word(notebook_path, output_path):
     font.name = 'Calibri'
     font.size = Pt(11)
     
-    # Temporary directory for images
-    with tempfile.TemporaryDirectory() as temp_dir:
-        current_h1_images = []
-        current_h1_text = []
-        is_first_h1 = True
-        seen_images = set()
-        
-        for cell in nb.cells:
-            # Extract images from cell outputs
-            cell_images = extract_cell_images(cell)
-            
-            if cell.cell_type == 'markdown':
-                # Extract base64 images from markdown
-                markdown_images = extract_base64_images(cell.source)
-                cell_images.extend(markdown_images)
-                
-                # Parse markdown content
-                lines = cell.source.split('\n')
-                for line in lines:
-                    level, text = parse_markdown_heading(line)
-                    
-                    if level == 1:
-                        # Process previous H1 section
-                        if not is_first_h1:
-                            # Add images from previous H1
-                            if current_h1_images:
-                                image_paths = []
-                                for img_data in current_h1_images:
-                                    img_hash = hash(img_data)
-                                    if img_hash not in seen_images:
-                                        seen_images.add(img_hash)
-                                        idx = len(seen_images)
-                                        img_path = save_image_temp(img_data, temp_dir, idx)
-                                        image_paths.append(img_path)
-                                
-                                if image_paths:
-                                    add_images_to_table(doc, image_paths)
-                            
-                            # Add page break after H1 section
-                            add_page_break(doc)
-                        
-                        # Start new H1 section
-                        current_h1_images = []
-                        current_h1_text = []
-                        is_first_h1 = False
-                        
-                        # Add H1 heading
-                        paragraph = doc.add_paragraph()
-                        set_heading_style(paragraph, 1)
-                        paragraph.add_run(text)
-                    
-                    elif level == 2:
-                        # Add H2 heading
-                        paragraph = doc.add_paragraph()
-                        set_heading_style(paragraph, 2)
-                        paragraph.add_run(text)
-                    
-                    elif level == 3:
-                        # Add H3 heading
-                        paragraph = doc.add_paragraph()
-                        set_heading_style(paragraph, 3)
-                        paragraph.add_run(text)
-                    
-                    elif level is None and line.strip():
-                        # Regular text (not a heading)
-                        # Skip image markdown syntax (already extracted)
-                        if not re.match(r'!\[.*?\]\(data:image', line) and not re.match(r'!\[.*?\]\(.*?\)', line):
-                            paragraph = doc.add_paragraph(line.strip())
-            
-            elif cell.cell_type == 'code':
-                # Handle code cell outputs (text)
-                if 'outputs' in cell:
-                    for output in cell.get('outputs', []):
-                        if output.get('output_type') == 'stream':
-                            text = ''.join(output.get('text', []))
+    current_h1_images = []
+    current_h1_text = []
+    is_first_h1 = True
+    seen_images = set()
+
+    for cell in nb.get('cells', []):
+        # Extract images from cell outputs
+        cell_images = extract_cell_images(cell)
+
+        if cell.get('cell_type') == 'markdown':
+            source = cell_source(cell)
+
+            # Extract base64 images from markdown
+            markdown_images = extract_base64_images(source)
+            cell_images.extend(markdown_images)
+
+            # Parse markdown content. Consecutive plain-text lines are
+            # buffered into one paragraph (one XML node per text block
+            # instead of one per line), flushed at headings, image lines
+            # and end of cell.
+            text_buffer = []
+
+            def flush_text():
+                if not text_buffer:
+                    return
+                paragraph = doc.add_paragraph()
+                run = paragraph.add_run(text_buffer[0])
+                for buffered in text_buffer[1:]:
+                    run.add_break()
+                    run = paragraph.add_run(buffered)
+                text_buffer.clear()
+
+            lines = source.split('\n')
+            for line in lines:
+                level, text = parse_markdown_heading(line)
+
+                if level is not None:
+                    flush_text()
+
+                if level == 1:
+                    # Process previous H1 section
+                    if not is_first_h1:
+                        # Add images from previous H1 (already deduped
+                        # at collection time)
+                        add_images_to_table(doc, current_h1_images)
+
+                        # Add page break after H1 section
+                        add_page_break(doc)
+
+                    # Start new H1 section
+                    current_h1_images = []
+                    current_h1_text = []
+                    is_first_h1 = False
+
+                    # Add H1 heading
+                    paragraph = doc.add_paragraph()
+                    set_heading_style(paragraph, 1)
+                    paragraph.add_run(text)
+
+                elif level == 2:
+                    # Add H2 heading
+                    paragraph = doc.add_paragraph()
+                    set_heading_style(paragraph, 2)
+                    paragraph.add_run(text)
+
+                elif level == 3:
+                    # Add H3 heading
+                    paragraph = doc.add_paragraph()
+                    set_heading_style(paragraph, 3)
+                    paragraph.add_run(text)
+
+                elif level is None and line.strip():
+                    # Regular text (not a heading)
+                    # Skip image markdown syntax (already extracted)
+                    if _IMG_LINE_RE.match(line):
+                        flush_text()
+                    else:
+                        text_buffer.append(line.strip())
+
+            flush_text()
+
+        elif cell.get('cell_type') == 'code':
+            # Handle code cell outputs (text)
+            if 'outputs' in cell:
+                for output in cell.get('outputs', []):
+                    if output.get('output_type') == 'stream':
+                        text = ''.join(output.get('text', []))
+                        if text.strip():
+                            paragraph = doc.add_paragraph()
+                            run = paragraph.add_run(text.strip())
+                            run.font.name = 'Courier New'
+                            run.font.size = Pt(9)
+                    elif output.get('output_type') == 'execute_result':
+                        data = output.get('data', {})
+                        if 'text/plain' in data:
+                            text = ''.join(data['text/plain'])
                             if text.strip():
                                 paragraph = doc.add_paragraph()
                                 run = paragraph.add_run(text.strip())
                                 run.font.name = 'Courier New'
                                 run.font.size = Pt(9)
-                        elif output.get('output_type') == 'execute_result':
-                            data = output.get('data', {})
-                            if 'text/plain' in data:
-                                text = ''.join(data['text/plain'])
-                                if text.strip():
-                                    paragraph = doc.add_paragraph()
-                                    run = paragraph.add_run(text.strip())
-                                    run.font.name = 'Courier New'
-                                    run.font.size = Pt(9)
-            
-            # Collect images for current H1
-            for img_data in cell_images:
-                img_hash = hash(img_data)
-                if img_hash not in seen_images:
-                    seen_images.add(img_hash)
-                    current_h1_images.append(img_data)
-        
-        # Process last H1 section
-        if current_h1_images:
-            image_paths = []
-            for img_data in current_h1_images:
-                img_hash = hash(img_data)
-                if img_hash not in seen_images:
-                    seen_images.add(img_hash)
-                    idx = len(seen_images)
-                    img_path = save_image_temp(img_data, temp_dir, idx)
-                    image_paths.append(img_path)
-            
-            if image_paths:
-                add_images_to_table(doc, image_paths)
-        
-        # Add page break after last H1 if there was content
-        if not is_first_h1:
-            add_page_break(doc)
-    
+
+        # Collect images for current H1. De-dupe hashes the base64 text
+        # directly, so only first occurrences are ever decoded. (The
+        # flush blocks used to re-check seen_images, which was always a
+        # hit by then — so no section ever emitted its images.)
+        for img_b64 in cell_images:
+            img_hash = _image_digest(img_b64.encode())
+            if img_hash in seen_images:
+                continue
+            try:
+                img_data = base64.b64decode(img_b64, validate=False)
+            except Exception:
+                continue
+            seen_images.add(img_hash)
+            current_h1_images.append(img_data)
+
+    # Process last H1 section
+    add_images_to_table(doc, current_h1_images)
+
+    # Add page break after last H1 if there was content
+    if not is_first_h1:
+        add_page_break(doc)
+
     # Save document
     doc.save(output_path)
     print(f"Converted {notebook_path} to {output_path}")
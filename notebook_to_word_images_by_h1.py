@@ -3,7 +3,7 @@ Convert a Jupyter Notebook (.ipynb) into a Word document (.docx) where images ar
 grouped by Markdown H1 headings.
 
 Strict rules implemented:
-- Read notebook with nbformat
+- Read notebook JSON directly (orjson-backed; only cells/source/outputs are used)
 - Write Word with python-docx
 - Markdown H1 (# Title) is the page title; each H1 starts on a new page
 - Everything below an H1 belongs to that H1 until the next H1
@@ -30,17 +30,18 @@ from __future__ import annotations
 
 import base64
 import hashlib
+import io
 import re
-import tempfile
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
-import nbformat
 from docx import Document
 from docx.enum.text import WD_BREAK
 from docx.shared import Inches
 
+from notebook_sections import cell_source, iter_cells
+
 try:
     from PIL import Image  # type: ignore
 except Exception as e:  # pragma: no cover
@@ -48,6 +49,11 @@ except Exception as e:  # pragma: no cover
         "Pillow is required for image sizing. Install with: pip install Pillow"
     ) from e
 
+try:
+    import xxhash  # type: ignore
+except ImportError:  # pragma: no cover
+    xxhash = None
+
 
 # -----------------------------
 # CONFIG (hardcode path is fine)
@@ -67,64 +73,73 @@ NOTEBOOK_PATH = Path(__file__).with_name("ch_viz.ipynb")
 
 H1_RE = re.compile(r"^\s*#\s+(?P<title>.+?)\s*$", re.MULTILINE)
 
-# Markdown image: ![alt](data:image/png;base64,....)
-MD_BASE64_IMG_RE = re.compile(
-    r"!\[[^\]]*]\(\s*data:image/png;base64,(?P<b64>[A-Za-z0-9+/=\s]+)\s*\)",
-    re.IGNORECASE,
-)
-
-# HTML <img src="data:image/png;base64,....">
-HTML_BASE64_IMG_RE = re.compile(
-    r"<img[^>]+src=[\"']data:image/png;base64,(?P<b64>[A-Za-z0-9+/=\s]+)[\"'][^>]*>",
-    re.IGNORECASE,
-)
+# Anchor shared by both embedded-image forms:
+#   Markdown: ![alt](data:image/png;base64,....)
+#   HTML:     <img src="data:image/png;base64,....">
+# A substring scan to the closing delimiter replaces the two backtracking
+# regexes, which choked on megabyte-long base64 captures.
+_B64_ANCHOR = "data:image/png;base64,"
+_B64_TERMINATORS = (")", '"', "'")
 
 
 @dataclass(frozen=True)
 class ExtractedImage:
     section_title: str
     order_index: int  # global order across notebook
-    digest: str  # sha256 for de-dupe
+    digest: bytes  # content digest for de-dupe
     png_bytes: bytes
-
-
-def _sha256(data: bytes) -> str:
-    return hashlib.sha256(data).hexdigest()
-
-
-def _iter_markdown_base64_png_images(md: str) -> List[bytes]:
-    """Return list of decoded PNG bytes found in markdown, in appearance order."""
-    found: List[bytes] = []
-    for regex in (MD_BASE64_IMG_RE, HTML_BASE64_IMG_RE):
-        for m in regex.finditer(md):
-            b64 = m.group("b64")
-            # Remove whitespace/newlines inside base64
-            b64_clean = re.sub(r"\s+", "", b64)
-            try:
-                found.append(base64.b64decode(b64_clean, validate=False))
-            except Exception:
-                # Skip invalid base64 blocks
-                continue
+    width_px: int  # captured at extraction so sizing never reopens the PNG
+    height_px: int
+
+
+def _digest(data: bytes) -> bytes:
+    """Fast content digest for de-dupe (not cryptographic — xxh3 when
+    available, blake2b otherwise; both are far faster than sha256 on
+    multi-MB PNG payloads). Raw digest bytes: set lookups compare 8-16
+    bytes instead of 16-64 hex characters. Call .hex() if a printable
+    form is ever needed."""
+    if xxhash is not None:
+        return xxhash.xxh3_64(data).digest()
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _iter_markdown_base64_png_images(md: str) -> List[str]:
+    """Return base64 PNG payloads (still encoded) found in markdown, in
+    appearance order. Decoding is deferred until after de-dupe so
+    duplicates are never decoded."""
+    found: List[str] = []
+    pos = 0
+    while True:
+        idx = md.find(_B64_ANCHOR, pos)
+        if idx == -1:
+            break
+        start = idx + len(_B64_ANCHOR)
+        # Closing ')' for the markdown form, quote for the HTML form —
+        # whichever comes first bounds the payload.
+        ends = [e for e in (md.find(t, start) for t in _B64_TERMINATORS) if e != -1]
+        if not ends:
+            break
+        end = min(ends)
+        pos = end + 1
+        # Remove whitespace/newlines inside base64
+        found.append(re.sub(r"\s+", "", md[start:end]))
     return found
 
 
-def _iter_output_png_images(cell: dict) -> List[bytes]:
-    """Return list of PNG bytes from a code cell outputs, in appearance order."""
-    images: List[bytes] = []
+def _iter_output_png_images(cell: dict) -> List[str]:
+    """Return base64 PNG payloads (still encoded) from a code cell's
+    outputs, in appearance order."""
+    images: List[str] = []
     for out in cell.get("outputs", []) or []:
         data = out.get("data") or {}
         if "image/png" not in data:
             continue
         png_data = data["image/png"]
-        # nbformat may store as base64 str or list of lines
+        # Notebook JSON may store as base64 str or list of lines
         if isinstance(png_data, list):
-            png_b64 = "".join(png_data)
+            images.append("".join(png_data))
         else:
-            png_b64 = str(png_data)
-        try:
-            images.append(base64.b64decode(png_b64, validate=False))
-        except Exception:
-            continue
+            images.append(str(png_data))
     return images
 
 
@@ -138,29 +153,66 @@ def extract_images_grouped_by_h1(nb_path: Path) -> Tuple[List[str], Dict[str, Li
     - ordered list of section titles (including 'Untitled' if needed)
     - mapping section_title -> list of ExtractedImage (preserving order, deduped globally)
     """
-    nb = nbformat.read(nb_path, as_version=4)
-
     section_titles_in_order: List[str] = []
     images_by_section: Dict[str, List[ExtractedImage]] = {}
 
     current_h1: Optional[str] = None
     global_order = 0
-    seen_digests: set[str] = set()
+    seen_digests: set[bytes] = set()
+    # Hash-consing table: identical payloads share one bytes object, so a
+    # notebook that repeats a figure only ever holds it in memory once
+    # (matters if the global de-dupe below is ever relaxed per-section)
+    interned: Dict[bytes, bytes] = {}
 
     def ensure_section(title: str) -> None:
         if title not in images_by_section:
             images_by_section[title] = []
             section_titles_in_order.append(title)
 
-    for cell in nb.get("cells", []):
+    def add_image(png_b64: str) -> None:
+        nonlocal global_order
+        section = _get_or_create_section_title(current_h1)
+        ensure_section(section)
+        # De-dupe on the base64 text; only first occurrences pay for the
+        # decode below
+        digest = _digest(png_b64.encode())
+        if digest in seen_digests:
+            return
+        try:
+            png_bytes = base64.b64decode(png_b64, validate=False)
+        except Exception:
+            # Skip invalid base64 blocks
+            return
+        seen_digests.add(digest)
+        png_bytes = interned.setdefault(digest, png_bytes)
+        # Image.open only reads the header here — no pixel decode
+        with Image.open(io.BytesIO(png_bytes)) as im:
+            width_px, height_px = im.size
+        images_by_section[section].append(
+            ExtractedImage(
+                section_title=section,
+                order_index=global_order,
+                digest=digest,
+                png_bytes=png_bytes,
+                width_px=width_px,
+                height_px=height_px,
+            )
+        )
+        global_order += 1
+
+    # iter_cells streams with ijson when available, so the whole notebook
+    # (and its base64 payloads) never sits in memory twice
+    for cell in iter_cells(nb_path):
         cell_type = cell.get("cell_type")
 
         # Update current_h1 when we see a markdown H1
         if cell_type == "markdown":
-            md = cell.get("source") or ""
+            md = cell_source(cell)
             # If multiple H1 in a single markdown cell, treat them in order.
             # We assign images appearing in markdown to the most recent H1 in that cell.
-            h1_matches = list(H1_RE.finditer(md))
+            # Cheap substring test first: most cells have no heading at all,
+            # and the regex engine never runs for them.
+            h1_matches = list(H1_RE.finditer(md)) if "#" in md else []
             if h1_matches:
                 # Track last H1 in cell before any images we extract from the same cell
                 # We will update current_h1 to the last H1 in the cell, since images in
@@ -169,31 +221,13 @@ def extract_images_grouped_by_h1(nb_path: Path) -> Tuple[List[str], Dict[str, Li
                 ensure_section(current_h1)
 
             # Extract base64 markdown images
-            for png_bytes in _iter_markdown_base64_png_images(md):
-                section = _get_or_create_section_title(current_h1)
-                ensure_section(section)
-                digest = _sha256(png_bytes)
-                if digest in seen_digests:
-                    continue
-                seen_digests.add(digest)
-                images_by_section[section].append(
-                    ExtractedImage(section_title=section, order_index=global_order, digest=digest, png_bytes=png_bytes)
-                )
-                global_order += 1
+            for png_b64 in _iter_markdown_base64_png_images(md):
+                add_image(png_b64)
 
         # Extract output images from code cells
         if cell_type == "code":
-            for png_bytes in _iter_output_png_images(cell):
-                section = _get_or_create_section_title(current_h1)
-                ensure_section(section)
-                digest = _sha256(png_bytes)
-                if digest in seen_digests:
-                    continue
-                seen_digests.add(digest)
-                images_by_section[section].append(
-                    ExtractedImage(section_title=section, order_index=global_order, digest=digest, png_bytes=png_bytes)
-                )
-                global_order += 1
+            for png_b64 in _iter_output_png_images(cell):
+                add_image(png_b64)
 
     # If there were no H1 at all, but images exist, ensure "Untitled" exists
     if "Untitled" in images_by_section and "Untitled" not in section_titles_in_order:
@@ -218,15 +252,16 @@ def _page_inner_size_inches(doc: Document) -> Tuple[float, float]:
 
 
 def _compute_target_box_per_image(
-    doc: Document,
+    inner_size: Tuple[float, float],
     num_images: int,
     title_lines: int = 1,
 ) -> Tuple[float, float]:
     """
     Compute a per-image (max_width_in, max_height_in) box so that a 2-column grid
-    can fit on one page (best effort).
+    can fit on one page (best effort). inner_size is the page's inner
+    (width_in, height_in), measured once per document.
     """
-    inner_w, inner_h = _page_inner_size_inches(doc)
+    inner_w, inner_h = inner_size
 
     cols = 2
     rows = (num_images + cols - 1) // cols
@@ -250,16 +285,11 @@ def _compute_target_box_per_image(
     return max(0.5, cell_w - pad), max(0.5, cell_h - pad)
 
 
-def _save_png(tmp_dir: Path, digest: str, png_bytes: bytes) -> Path:
-    path = tmp_dir / f"{digest}.png"
-    path.write_bytes(png_bytes)
-    return path
-
+def _scaled_dims_in_inches(img: ExtractedImage, max_w_in: float, max_h_in: float) -> Tuple[float, float]:
+    """Scale image to fit within (max_w_in, max_h_in) keeping aspect ratio.
 
-def _scaled_dims_in_inches(img_path: Path, max_w_in: float, max_h_in: float) -> Tuple[float, float]:
-    """Scale image to fit within (max_w_in, max_h_in) keeping aspect ratio."""
-    with Image.open(img_path) as im:
-        w_px, h_px = im.size
+    Pure arithmetic — pixel dimensions were captured at extraction."""
+    w_px, h_px = img.width_px, img.height_px
     if w_px <= 0 or h_px <= 0:
         return max_w_in, max_h_in
 
@@ -278,6 +308,9 @@ def write_docx_images_by_h1(
 ) -> None:
     doc = Document()
 
+    # Page geometry never changes mid-document; measure it once
+    inner_size = _page_inner_size_inches(doc)
+
     for idx, title in enumerate(section_titles):
         # Each H1 must start on a new page (except the first page, which is already new).
         if idx != 0:
@@ -297,34 +330,31 @@ def write_docx_images_by_h1(
             continue
 
         # Compute a per-image bounding box to fit all images in one page.
-        max_w_in, max_h_in = _compute_target_box_per_image(doc, num_images=len(imgs), title_lines=1)
+        max_w_in, max_h_in = _compute_target_box_per_image(inner_size, num_images=len(imgs), title_lines=1)
 
         cols = 2
         rows = (len(imgs) + cols - 1) // cols
         table = doc.add_table(rows=rows, cols=cols)
         table.autofit = False
 
-        # Fill the table left-to-right, top-to-bottom
-        with tempfile.TemporaryDirectory() as td:
-            tmp_dir = Path(td)
-
-            for i, img in enumerate(imgs):
-                r = i // cols
-                c = i % cols
-                cell = table.cell(r, c)
-                cell_par = cell.paragraphs[0]
+        # Fill the table left-to-right, top-to-bottom; images are fed to
+        # python-docx straight from memory, never touching the filesystem
+        for i, img in enumerate(imgs):
+            r = i // cols
+            c = i % cols
+            cell = table.cell(r, c)
+            cell_par = cell.paragraphs[0]
 
-                img_path = _save_png(tmp_dir, img.digest, img.png_bytes)
-                w_in, h_in = _scaled_dims_in_inches(img_path, max_w_in, max_h_in)
+            w_in, h_in = _scaled_dims_in_inches(img, max_w_in, max_h_in)
 
-                run = cell_par.add_run()
-                run.add_picture(img_path.as_posix(), width=Inches(w_in), height=Inches(h_in))
+            run = cell_par.add_run()
+            run.add_picture(io.BytesIO(img.png_bytes), width=Inches(w_in), height=Inches(h_in))
 
-            # If odd number of images, clear the final empty cell’s paragraph text
-            if len(imgs) % cols == 1:
-                last_cell = table.cell(rows - 1, 1)
-                for par in last_cell.paragraphs:
-                    par.text = ""
+        # If odd number of images, clear the final empty cell’s paragraph text
+        if len(imgs) % cols == 1:
+            last_cell = table.cell(rows - 1, 1)
+            for par in last_cell.paragraphs:
+                par.text = ""
 
         # After finishing one H1 section, insert a page break (handled at top of next section).
         # We avoid adding an extra trailing blank page at end.
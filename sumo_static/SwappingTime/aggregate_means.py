@@ -3,6 +3,13 @@ import re
 from pathlib import Path
 import pandas as pd
 
+try:
+    import pyarrow  # noqa: F401
+    # pandas' pyarrow CSV engine is multithreaded with SIMD float parsing
+    _READ_KW = {"engine": "pyarrow"}
+except ImportError:
+    _READ_KW = {}
+
 INPUT_DIR = Path(".")            # put all your per-run CSVs here
 OUTPUT = Path("data.csv")           # aggregated table
 
@@ -30,50 +37,44 @@ def extract_swap_time(path: Path) -> int:
         return int(m.group(1))
     raise ValueError(f"Could not extract swap time from filename: {path.name}")
 
-def summarize_one(csv_path: Path) -> dict:
-    df = pd.read_csv(csv_path)
-    # ensure numeric
-    for c in NUM_COLS:
-        df[c] = pd.to_numeric(df[c], errors="coerce")
-    means = df[NUM_COLS].mean()
-
-    swap_time = extract_swap_time(csv_path)
-    
-    out = {
-        "Swap Time (min)": swap_time,
-        "Total Travel Time": float(f"{means['Total Travel Time']:.2f}"),
-        "Total Energy Consumed": float(f"{means['Total Energy Consumed']:.3f}"),
-        "Total Distance Covered": float(f"{means['Total Distance Covered']:.2f}"),
-        "Run Time": float(f"{means['Run Time']:.3f}"),
-        "Total Module Swapped": int(round(means["Total Module Swapped"])),
-    }
-    return out
+def read_one(csv_path: Path) -> pd.DataFrame:
+    # usecols skips parsing the columns we never aggregate
+    df = pd.read_csv(csv_path, usecols=NUM_COLS, **_READ_KW)
+    df["Swap Time (min)"] = extract_swap_time(csv_path)
+    return df
 
 def main():
-    rows = []
+    frames = []
     # Match files like *min*.csv (e.g., 1min_summary.csv, 2min_summary.csv)
     for csv_path in sorted(INPUT_DIR.glob("*min*.csv")):
         if csv_path.name.lower() == OUTPUT.name.lower():
             continue
         try:
-            rows.append(summarize_one(csv_path))
+            frames.append(read_one(csv_path))
         except Exception as e:
             print(f"Skip {csv_path.name}: {e}")
 
-    if not rows:
+    if not frames:
         print("No input CSVs found.")
         return
 
-    data = pd.DataFrame(rows, columns=[
-        "Swap Time (min)",
-        "Total Travel Time",
-        "Total Energy Consumed",
-        "Total Distance Covered",
-        "Run Time",
-        "Total Module Swapped",
-    ])
-    # Sort by Swap Time (min)
-    data = data.sort_values("Swap Time (min)")
+    # One concat + groupby replaces a per-file pandas round trip; to_numeric
+    # runs once per column over the whole batch
+    big = pd.concat(frames, ignore_index=True)
+    for c in NUM_COLS:
+        big[c] = pd.to_numeric(big[c], errors="coerce")
+    means = big.groupby("Swap Time (min)")[NUM_COLS].mean()
+
+    means = means.round({
+        "Total Travel Time": 2,
+        "Total Energy Consumed": 3,
+        "Total Distance Covered": 2,
+        "Run Time": 3,
+    })
+    means["Total Module Swapped"] = means["Total Module Swapped"].round().astype(int)
+
+    # groupby sorts by Swap Time (min) already
+    data = means.reset_index()
     data.to_csv(OUTPUT, index=False)
     print(f"Wrote {len(data)} rows to {OUTPUT}")
 